@@ -20,6 +20,8 @@ set -euo pipefail
 : "${CRON_TZ:=Australia/Melbourne}"
 # CRON_TAG: label that wraps the cron entry between "BEGIN/END" blocks - helpful for removing job later
 : "${CRON_TAG:=emby_watch_hist_refresh}"
+# PY_SCRIPT_ARGS: extra arguments for the python script, e.g. "--incremental" to sync in place instead of rebuilding
+: "${PY_SCRIPT_ARGS:=}"
 
 
 
@@ -93,6 +95,7 @@ Env overrides:
   CRON_SCHEDULE="15 3 * * *"         # standard cron expression
   CRON_TZ="Australia/Melbourne"      # optional; else system TZ is used
   CRON_TAG="refresh_data_job"        # identifies the cron block
+  PY_SCRIPT_ARGS="--incremental"     # sync watch history in place instead of rebuilding the database
 USAGE
 }
 
@@ -107,7 +110,7 @@ remove_cron_block() {
 
 # command that cron will run: cd into project, run python, log output
 build_job_command() {
-  local cmd core="cd \"$PROJECT_ROOT\" && PYTHONPATH=\"$PYTHONPATH_VALUE\" \"$PYTHON\" \"$PY_SCRIPT\""
+  local cmd core="cd \"$PROJECT_ROOT\" && PYTHONPATH=\"$PYTHONPATH_VALUE\" \"$PYTHON\" \"$PY_SCRIPT\" ${PY_SCRIPT_ARGS}"
   if [[ -n "$FLOCK_BIN" ]]; then
     cmd="$FLOCK_BIN -n \"$LOCK_FILE\" /bin/bash -lc '$core >> \"$OUT_LOG\" 2>> \"$ERR_LOG\"'"
   else
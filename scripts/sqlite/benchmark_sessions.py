@@ -0,0 +1,306 @@
+from connectors import SQLiteConnector
+from datetime import datetime, timedelta
+from pathlib import Path
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+# benchmarks the watch-history sessionization on a large synthetic history
+#   "legacy": the original session query (runtime looked up via correlated subqueries per output row) + the original 
+#             completion ratio update, written to a temp table. It reads a temp copy of the raw events in the original 
+#             TEXT-keyed schema (made before timing), not the watch_hist_raw_events view, so the baseline doesn't pay for 
+#             the view's key joins and date()/time() formatting
+#   "sql":    SQLiteConnector._INIT_POPULATE_watch_hist_agg_sessions(engine="sql") (runtime joined once, ratio + outcome in one pass)
+#   "pandas": SQLiteConnector._INIT_POPULATE_watch_hist_agg_sessions(engine="pandas") (vectorized NumPy/pandas sessionization)
+# all engines must produce identical sessions (parity check), the script exits non-zero if they don't
+#
+# usage (from project root): PYTHONPATH=src python scripts/sqlite/benchmark_sessions.py --events 1000000
+
+parser = argparse.ArgumentParser(description="Benchmark watch-history sessionization on synthetic data")
+parser.add_argument("--events", type=int, default=500_000, help="number of synthetic raw watch events")
+parser.add_argument("--users", type=int, default=25, help="number of synthetic users")
+parser.add_argument("--items", type=int, default=20_000, help="number of synthetic library items")
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument("--engines", nargs="+", default=["legacy", "sql", "pandas"], choices=["legacy", "sql", "pandas"])
+args = parser.parse_args()
+
+SESSION_COLUMNS = """
+    user_id, item_id, session_start_timestamp, session_end_timestamp, session_span_minutes,
+    total_seconds_watched, session_count, ROUND(completion_ratio, 9), outcome
+"""
+
+
+def legacy_session_sql(
+    session_segment_minutes: int = 15,
+    completed_ratio_threshold: float = 0.9,
+    partial_ratio_threshold: float = 0.25,
+    min_sampled_seconds: int = 60,
+) -> str:
+    """The session query as it was before the runtime join was hoisted out of the per-row subqueries"""
+    session_gap_days = session_segment_minutes / 1440.0
+    completed_t = float(completed_ratio_threshold)
+    partial_t = float(partial_ratio_threshold)
+    min_sample = int(min_sampled_seconds)
+    return f"""
+        INSERT INTO temp.legacy_sessions 
+        (user_id, item_id, session_start_timestamp, 
+        session_end_timestamp, session_span_minutes, total_seconds_watched, 
+        session_count, completion_ratio, outcome)
+        WITH ordered_events AS (
+            -- First, get all events with proper datetime formatting
+            SELECT 
+                user_id,
+                item_id,
+                item_type,
+                datetime(date || ' ' || time) as event_timestamp,
+                duration,
+                row_id
+            FROM temp.legacy_raw_events
+            ORDER BY user_id, item_id, date, time
+        ),
+        session_boundaries AS (
+            -- Identify session boundaries using LAG window function
+            SELECT 
+                *,
+                LAG(event_timestamp) OVER (
+                    PARTITION BY user_id, item_id 
+                    ORDER BY event_timestamp
+                ) as prev_event_timestamp,
+                -- Check if gap from previous event > session_segment_minutes
+                CASE 
+                    WHEN LAG(event_timestamp) OVER (
+                        PARTITION BY user_id, item_id 
+                        ORDER BY event_timestamp
+                    ) IS NULL THEN 1  -- First event is always new session
+                    WHEN julianday(event_timestamp) - julianday(
+                        LAG(event_timestamp) OVER (
+                            PARTITION BY user_id, item_id 
+                            ORDER BY event_timestamp
+                        )
+                    ) > {session_gap_days} THEN 1  -- Gap > threshold means new session
+                    ELSE 0
+                END as is_new_session
+            FROM ordered_events
+        ),
+        session_groups AS (
+            -- Assign session IDs using cumulative sum of new session markers
+            SELECT 
+                *,
+                SUM(is_new_session) OVER (
+                    PARTITION BY user_id, item_id 
+                    ORDER BY event_timestamp
+                    ROWS UNBOUNDED PRECEDING
+                ) as session_group_id
+            FROM session_boundaries
+        )
+        -- Final aggregation by session
+        SELECT 
+            user_id,
+            item_id,
+            MIN(event_timestamp) as session_start_timestamp,
+            MAX(event_timestamp) as session_end_timestamp,
+            CAST(
+                (julianday(MAX(event_timestamp)) - julianday(MIN(event_timestamp))) * 1440 
+                AS INTEGER
+            ) as session_span_minutes,
+            SUM(duration) as total_seconds_watched,
+            COUNT(*) as session_count,
+            -- Compute completion ratio using actual runtime when available
+            CASE 
+                WHEN (
+                    SELECT runtime_seconds 
+                    FROM library_items 
+                    WHERE item_id = session_groups.item_id
+                ) > 0 THEN 
+                    MIN(
+                        1.0, 
+                        SUM(duration) / CAST((
+                            SELECT runtime_seconds 
+                            FROM library_items 
+                            WHERE item_id = session_groups.item_id
+                        ) AS REAL)
+                    )
+                WHEN MAX(item_type) = 'Episode' THEN 
+                    MIN(1.0, SUM(duration) / 1500.0)  -- Fallback 25 min
+                WHEN MAX(item_type) = 'Movie' THEN   
+                    MIN(1.0, SUM(duration) / 7200.0)  -- Fallback 2 hours
+                ELSE NULL
+            END as completion_ratio,
+            -- Determine outcome using actual runtime when available
+            CASE 
+                WHEN (
+                    SELECT runtime_seconds 
+                    FROM library_items 
+                    WHERE item_id = session_groups.item_id
+                ) > 0 THEN 
+                    CASE
+                        WHEN SUM(duration) >= {completed_t} * (
+                            SELECT runtime_seconds 
+                            FROM library_items 
+                            WHERE item_id = session_groups.item_id
+                        ) THEN 'completed'
+                        WHEN SUM(duration) >= {partial_t} * (
+                            SELECT runtime_seconds 
+                            FROM library_items 
+                            WHERE item_id = session_groups.item_id
+                        ) THEN 'partial'
+                        WHEN SUM(duration) >= {min_sample} THEN 'sampled'
+                        ELSE 'abandoned'
+                    END
+                WHEN MAX(item_type) = 'Episode' THEN
+                    CASE
+                        WHEN SUM(duration) >= 1200 THEN 'completed'  -- 20+ min for episodes
+                        WHEN SUM(duration) >= 300 THEN 'partial'     -- 5-20 min
+                        WHEN SUM(duration) >= 60 THEN 'sampled'      -- 1-5 min
+                        ELSE 'abandoned'                              -- <1 min
+                    END
+                WHEN MAX(item_type) = 'Movie' THEN
+                    CASE
+                        WHEN SUM(duration) >= 5400 THEN 'completed'  -- 90+ min for movies
+                        WHEN SUM(duration) >= 1800 THEN 'partial'    -- 30-90 min
+                        WHEN SUM(duration) >= 300 THEN 'sampled'     -- 5-30 min
+                        ELSE 'abandoned'                              -- <5 min
+                    END
+                ELSE 'unknown'
+            END as outcome
+        FROM session_groups
+        GROUP BY user_id, item_id, session_group_id
+        ORDER BY user_id, item_id, MIN(event_timestamp)
+    """
+
+
+
+def synthetic_event(ts: datetime, user: int, item_id: str, item_type: str, duration: int) -> dict:
+    """One watch event in the shape EmbyConnector returns them"""
+    return {
+        "date": ts.strftime("%Y-%m-%d"), "time": ts.strftime("%H:%M:%S"), "user_id": f"user{user:04d}",
+        "item_name": f"name {item_id}", "item_id": item_id, "item_type": item_type, "duration": duration,
+        "remote_address": "", "user_name": f"user {user}",
+    }
+
+
+def populate_synthetic(sqlite: SQLiteConnector, conn: sqlite3.Connection):
+    """Fill library_items + watch_hist_raw_events with a reproducible synthetic history (loaded like an Emby fetch)"""
+    rng = random.Random(args.seed)
+    sqlite._INIT_create_library_items_schema()
+    sqlite._INIT_create_user_watch_hist_schemas()
+
+    items = []
+    for i in range(args.items):
+        is_episode = rng.random() < 0.8
+        # ~10% of items have no runtime so the per-type fallbacks are exercised too
+        runtime_ticks = 0 if rng.random() < 0.1 else rng.randint(20, 150) * 60 * 10_000_000
+        items.append((str(100_000 + i), f"item {i}", "Episode" if is_episode else "Movie", runtime_ticks))
+    conn.executemany("INSERT INTO library_items (item_id, item_name, item_type, runtime_ticks) VALUES (?,?,?,?)", items)
+    conn.commit()
+
+    # events for items missing from library_items as well (deleted media still shows up in history)
+    item_pool = [(item_id, item_type) for item_id, _, item_type, _ in items] + [(str(900_000 + i), "Episode") for i in range(200)]
+    start = datetime(2021, 1, 1)
+    events = []
+    for n in range(args.events):
+        user = rng.randrange(args.users)
+        item_id, item_type = rng.choice(item_pool)
+        ts = start + timedelta(seconds=rng.randrange(0, 4 * 365 * 86400))
+        events.append(synthetic_event(ts, user, item_id, item_type, rng.randint(5, 7200)))
+        # bursts of follow-up events inside the session gap
+        while rng.random() < 0.5 and n < args.events:
+            ts += timedelta(minutes=rng.randint(1, 20))
+            events.append(synthetic_event(ts, user, item_id, item_type, rng.randint(5, 1800)))
+    sqlite._insert_watch_hist_raw_events([("synthetic", events[:args.events])], chunk_size=50_000)
+
+
+def timed(label: str, func):
+    t0 = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - t0
+    print(f"[BENCH] {label:<10} {elapsed:8.2f}s")
+    return elapsed
+
+
+original_cwd = os.getcwd()
+with tempfile.TemporaryDirectory() as tmp:
+    # SQLiteConnector always stores databases under ./sqlite_db
+    os.chdir(tmp)
+    # no timezone correction, synthetic timestamps are stored as generated
+    sqlite = SQLiteConnector("benchmark_sessions.db", timezone_rules=[])
+    sqlite.connect_db(profile="bulk_load")
+    conn = sqlite._connection
+
+    print(f"[INFO] Generating {args.events:,} events for {args.users} users over {args.items:,} items...")
+    populate_synthetic(sqlite, conn)
+    n_events = conn.execute("SELECT COUNT(*) FROM watch_hist_raw_events").fetchone()[0]
+    print(f"[INFO] {n_events:,} raw events stored in {Path(tmp) / 'sqlite_db'}")
+
+    # the pre surrogate-key raw events table (+ its index), copied out of the compatibility view outside the timings
+    conn.execute("""
+        CREATE TEMP TABLE legacy_raw_events(
+            row_id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, time TEXT NOT NULL, user_id TEXT NOT NULL,
+            item_name TEXT NOT NULL, item_id TEXT NOT NULL, item_type TEXT NOT NULL, duration INTEGER NOT NULL,
+            remote_address TEXT, user_name TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        INSERT INTO temp.legacy_raw_events (row_id, date, time, user_id, item_name, item_id, item_type, duration, remote_address, user_name)
+        SELECT row_id, date, time, user_id, item_name, item_id, item_type, duration, remote_address, user_name FROM watch_hist_raw_events
+    """)
+    conn.execute("CREATE INDEX temp.idx_legacy_raw_user_time ON legacy_raw_events(user_id, date, time DESC)")
+    conn.commit()
+
+    # the pre surrogate-key sessions table
+    conn.execute("""
+        CREATE TEMP TABLE legacy_sessions(
+            session_id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, item_id TEXT NOT NULL,
+            session_start_timestamp TEXT NOT NULL, session_end_timestamp TEXT NOT NULL, session_span_minutes INTEGER,
+            total_seconds_watched INTEGER NOT NULL, session_count INTEGER NOT NULL, completion_ratio REAL, outcome TEXT,
+            UNIQUE(user_id, item_id, session_start_timestamp)
+        )
+    """)
+
+    def run_legacy():
+        conn.execute("DELETE FROM temp.legacy_sessions")
+        conn.execute(legacy_session_sql())
+        conn.commit()
+        # the original update_completion_ratios()
+        conn.execute("""
+            UPDATE temp.legacy_sessions
+            SET completion_ratio = MIN(
+                1.0,
+                CAST(total_seconds_watched AS REAL) / (
+                    SELECT runtime_seconds FROM library_items l WHERE l.item_id = legacy_sessions.item_id
+                )
+            )
+            WHERE EXISTS (
+                SELECT 1 FROM library_items l WHERE l.item_id = legacy_sessions.item_id AND l.runtime_seconds > 0
+            )
+        """)
+        conn.commit()
+
+    runners = {
+        "legacy": run_legacy,
+        "sql": lambda: sqlite._INIT_POPULATE_watch_hist_agg_sessions(engine="sql"),
+        "pandas": lambda: sqlite._INIT_POPULATE_watch_hist_agg_sessions(engine="pandas"),
+    }
+    timings = {}
+    results = {}
+    for engine in args.engines:
+        timings[engine] = timed(engine, runners[engine])
+        sessions_table = "temp.legacy_sessions" if engine == "legacy" else "watch_hist_agg_sessions"
+        results[engine] = sorted(conn.execute(f"SELECT {SESSION_COLUMNS} FROM {sessions_table}").fetchall())
+
+    baseline = args.engines[0]
+    print(f"[INFO] {len(results[baseline]):,} sessions")
+    for engine in args.engines[1:]:
+        print(f"[INFO] {engine} vs {baseline}: x{timings[baseline] / timings[engine]:.2f}")
+    sqlite._connection.close()
+    os.chdir(original_cwd)
+
+mismatched = [engine for engine in args.engines if results[engine] != results[baseline]]
+if mismatched:
+    print(f"[ERROR] Session output of {', '.join(mismatched)} differs from {baseline}", file=sys.stderr)
+    exit(1)
+print(f"[OK] Sessions are identical across engines: {', '.join(args.engines)}")
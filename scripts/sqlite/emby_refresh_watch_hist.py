@@ -4,13 +4,77 @@ from zoneinfo import ZoneInfo
 from pathlib import Path
 from dotenv import load_dotenv
 from utils import Notifications
+from contextlib import closing
+import argparse
 import os
-import shutil
+import sqlite3
 
 # this script rebuilds the emby user watch history database, and saves the old database as a backup
+# the rebuild happens in a shadow file next to the live database, which only replaces the live one once it validates, 
+# so readers never see a missing or half-built database
+# with --incremental it instead syncs the existing database in place, only fetching new watch history and library items 
+# added/modified since the last run
+
+parser = argparse.ArgumentParser(description="Refresh the EMBRACE SQLite database from Emby")
+parser.add_argument("--incremental", action="store_true", help="sync new watch history into the existing database instead of rebuilding it")
+parser.add_argument(
+    "--min-retained-ratio", type=float, default=0.9,
+    help="rebuild only: refuse to publish if the shadow database holds fewer raw watch events than this fraction of the live one",
+)
+args = parser.parse_args()
 
 load_dotenv()
 
+
+def backup_database(src_path: Path, dest_path: Path):
+    """Consistent online copy with SQLite's backup API - readers (and WAL contents) are handled by SQLite itself"""
+    with closing(sqlite3.connect(src_path)) as src, closing(sqlite3.connect(dest_path)) as dest:
+        src.backup(dest)
+
+
+def validate_database(shadow_path: Path, live_path: Path) -> list[str]:
+    """Returns the reasons the shadow database must not be published (empty list = OK)"""
+    problems = []
+    with closing(sqlite3.connect(f"{shadow_path.resolve().as_uri()}?mode=ro", uri=True)) as conn:
+        check = conn.execute("PRAGMA quick_check").fetchone()[0]
+        if check != "ok":
+            problems.append(f"quick_check: {check}")
+        for table in ("library_items", "watch_hist_raw_events", "watch_hist_agg_sessions", "watch_hist_user_item_stats"):
+            try:
+                if conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0:
+                    problems.append(f"{table} is empty")
+            except sqlite3.Error as e:
+                problems.append(f"{table}: {e}")
+        shadow_events = conn.execute("SELECT COUNT(*) FROM watch_hist_raw_events").fetchone()[0] if not problems else 0
+    
+    # a partial Emby fetch shouldn't silently replace a fuller history
+    if not problems and live_path.exists():
+        try:
+            with closing(sqlite3.connect(f"{live_path.resolve().as_uri()}?mode=ro", uri=True)) as conn:
+                live_events = conn.execute("SELECT COUNT(*) FROM watch_hist_raw_events").fetchone()[0]
+        except sqlite3.Error:
+            live_events = 0
+        if shadow_events < live_events * args.min_retained_ratio:
+            problems.append(f"only {shadow_events} raw events vs {live_events} in the live database")
+    return problems
+
+
+def publish_database(shadow_path: Path, live_path: Path):
+    """Swap the validated shadow database in for the live one"""
+    if not live_path.exists():
+        # nobody can have it open yet: atomic rename (drop any stale sidecars first, they'd be applied to the new file)
+        for sidecar in (Path(f"{live_path}-wal"), Path(f"{live_path}-shm")):
+            sidecar.unlink(missing_ok=True)
+        os.replace(shadow_path, live_path)
+        return
+    # readers may hold the live file open in WAL mode, and renaming over it would pair their -wal/-shm files with the 
+    # new database - so copy the pages in with the backup API instead: one write transaction on the live file, 
+    # readers see the old or the new database, never a gap
+    with closing(sqlite3.connect(shadow_path)) as src, closing(sqlite3.connect(live_path, timeout=60)) as dest:
+        src.backup(dest)
+    shadow_path.unlink()
+
+
 # =======================
 # Backup current DB file
 # =======================
@@ -28,27 +92,35 @@ today_date = datetime.now(tz=tz).strftime("%Y%m%d-%H:%M:%S")
 SQLITE_DIR.mkdir(parents=True, exist_ok=True)
 BACKUP_DIR.mkdir(parents=True, exist_ok=True)
 SQLITE_DB_NAME = os.getenv("SQLITE_DB_NAME") or "EMBRACE_SQLITE_DB.db"
+SHADOW_DB_NAME = f"{SQLITE_DB_NAME}.shadow"
 
 db_path = (SQLITE_DIR / SQLITE_DB_NAME).resolve()
 legacy_db_path = (ROOT_DIR / "sqlite_db" / SQLITE_DB_NAME).resolve()
 if not db_path.exists() and legacy_db_path.exists():
     print(f"[INFO] SQLite database found in legacy path: {legacy_db_path}")
     db_path = legacy_db_path
+shadow_path = (SQLITE_DIR / SHADOW_DB_NAME).resolve()
 
 backup_path = BACKUP_DIR / f"{SQLITE_DB_NAME}_{today_date}.backup"
 
-if not db_path.exists():
+if args.incremental:
+    print(f"[INFO] Incremental mode - syncing {db_path} in place, no backup taken")
+elif not db_path.exists():
     print(f"[WARN] SQLite database not found: {db_path}")
     print("[INFO] Proceeding without backup - a new database will be created")
 else:
     try:
-        # copy first, then unlink original after success
-        shutil.copy2(db_path, backup_path)
+        # live database stays in place (and readable) - it is only replaced once the shadow rebuild validates
+        backup_database(db_path, backup_path)
         print(f"[OK] Backup created at {backup_path}")
-        db_path.unlink()
     except Exception as e:
         print(f"[ERROR] Failed to back up database: {e}")
         exit(1)
+
+if not args.incremental:
+    # leftovers from an interrupted rebuild
+    for stale in (shadow_path, Path(f"{shadow_path}-wal"), Path(f"{shadow_path}-shm")):
+        stale.unlink(missing_ok=True)
         
         
 # =======================
@@ -56,32 +128,73 @@ else:
 # =======================
 ENVIRONMENT = os.getenv("ENVIRONMENT") or "dev"
 TMDB_READ_ACCESS_TOKEN = os.getenv("TMDB_READ_ACCESS_TOKEN")
-sqlite = SQLiteConnector(SQLITE_DB_NAME, debug=True)
+sqlite = SQLiteConnector(SQLITE_DB_NAME if args.incremental else SHADOW_DB_NAME, debug=True)
 Emby = EmbyConnector(debug=(ENVIRONMENT == "dev"))
 TMDB = TMDBConnector(TMDB_READ_ACCESS_TOKEN, debug=(ENVIRONMENT == "dev"))
 
-sqlite.connect_db()
+sqlite.connect_db(profile="bulk_load")
 
 # ingest library metadata first so runtime is available for later calculations
 sqlite._INIT_create_library_items_schema()
-ok = sqlite.ingest_all_library_items(Emby.iter_all_items(), Emby.get_item_metadata)
+if args.incremental:
+    # only items saved since the last sync, plus a daily id-only scan to prune deletions
+    ok = sqlite.sync_library_items(Emby.iter_all_items, Emby.iter_all_item_ids, get_items_metadata=Emby.get_items_metadata)
+else:
+    ok = sqlite.ingest_all_library_items(Emby.iter_all_items(), get_items_metadata=Emby.get_items_metadata)
 print("Ingest complete:", ok)
 
 # process watch history using actual runtimes
-sqlite._INIT_POPULATE_watch_hist_raw_events(Emby.get_all_watch_hist)
-sqlite._INIT_POPULATE_watch_hist_agg_sessions()
-sqlite._INIT_POPULATE_watch_hist_user_item_stats()
-sqlite.update_completion_ratios()
+if args.incremental:
+    watch_hist_ok = all([
+        sqlite.sync_watch_hist_raw_events(Emby.iter_all_watch_hist),
+        sqlite.refresh_watch_hist_agg_sessions(),
+        sqlite.refresh_watch_hist_user_item_stats(),
+        sqlite.refresh_user_affinity(),
+        sqlite.refresh_user_series_stats(),
+    ])
+else:
+    watch_hist_ok = all([
+        sqlite._INIT_POPULATE_watch_hist_raw_events(Emby.iter_all_watch_hist),
+        sqlite._INIT_POPULATE_watch_hist_agg_sessions(),
+        sqlite._INIT_POPULATE_watch_hist_user_item_stats(),
+        sqlite._INIT_POPULATE_user_affinity(),
+        sqlite._INIT_POPULATE_user_series_stats(),
+    ])
 
  # create and ingest TMDB tables
 sqlite._INIT_create_tmdb_schemas()
 sqlite.ingest_tmdb_movie_tv_genres(TMDB.fetch_movie_genres, TMDB.fetch_tv_genres)
+sqlite.close()
+
+
+# =======================
+# Publish rebuilt db file
+# =======================
+published = "n/a (incremental)"
+if not args.incremental:
+    problems = validate_database(shadow_path, db_path)
+    if not (ok and watch_hist_ok):
+        problems.append("an ingest step failed")
+    if problems:
+        published = f"NO - kept the live database ({'; '.join(problems)}), shadow left at {shadow_path.name}"
+        print(f"[ERROR] Shadow database failed validation: {problems}")
+    else:
+        try:
+            publish_database(shadow_path, db_path)
+            published = "yes"
+            print(f"[OK] Rebuilt database published to {db_path}")
+        except Exception as e:
+            published = f"NO - publish failed: {e}"
+            print(f"[ERROR] Failed to publish rebuilt database: {e}")
 
 finished_at = datetime.now(tz=tz).strftime("%Y-%m-%d %H:%M:%S %Z")
 Notifications().discord_send_webhook(
     f"Cron job: Emby watch history refresh finished at {finished_at}\n"
-    f"Ingest complete: {ok}\n"
-    f"Backup: {backup_path.name}"
+    f"Ingest complete: {ok and watch_hist_ok}\n"
+    f"Published: {published}\n"
+    f"Backup: {'none (incremental)' if args.incremental else (backup_path.name if backup_path.exists() else 'none (no live database)')}"
     )
 
-exit(0)
\ No newline at end of file
+# non-zero for cron whenever an ingest/refresh step failed, or a rebuild wasn't published
+succeeded = ok and watch_hist_ok and (args.incremental or published == "yes")
+exit(0 if succeeded else 1)
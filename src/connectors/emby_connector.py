@@ -1,6 +1,14 @@
-from typing import Final, Dict, Iterable, Optional, Sequence, Tuple
+from typing import Callable, Deque, Final, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from itertools import islice
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sys
+import threading
+import time
 from dotenv import load_dotenv
 import os
 
@@ -12,13 +20,27 @@ class EmbyConnector:
     """
     
     # TODO: add logic to check for existing DB
-    def __init__(self, debug = False):
+    def __init__(
+        self,
+        debug = False,
+        pool_size: int = 10,
+        timeout: float = 30,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        user_cache_ttl: float = 300,
+    ):
         """
         Args:
             debug (bool): Optional, whether to display debug print statements
+            pool_size (int): Optional, max number of keep-alive connections held open to the Emby server
+            timeout (float): Optional, per-request timeout in seconds
+            max_retries (int): Optional, how many times a request is retried on connection resets or 5xx responses
+            backoff_factor (float): Optional, exponential backoff between retries (0.5 -> 0.5s, 1s, 2s, ...)
+            user_cache_ttl (float): Optional, seconds the cached Emby user directory is trusted before being re-fetched
         """
         
         self._debug: Final = debug
+        self._timeout: Final = timeout
 
         load_dotenv()
         self.__BASE_DOMAIN: Final = os.getenv("BASE_DOMAIN")
@@ -32,6 +54,62 @@ class EmbyConnector:
             print("Error: EMBY_API_KEY environment variable is not set.", file=sys.stderr)
             exit(1)
         
+        self._session: Final = self._create_session(pool_size, max_retries, backoff_factor)
+        
+        # user directory cache: {username: user_id}, shared by every method that needs user ids
+        self._user_cache_ttl: Final = user_cache_ttl
+        self._user_cache: Optional[Dict[str, str]] = None
+        self._user_cache_fetched_at: float = 0.0
+        self._user_cache_lock: Final = threading.Lock()
+        
+        # {username: seconds} for the most recent get_all_watch_hist() / iter_all_watch_hist() call
+        self.last_watch_hist_latencies: Dict[str, float] = {}
+        
+    
+    def _create_session(self, pool_size: int, max_retries: int, backoff_factor: float) -> requests.Session:
+        """
+        Build the pooled HTTP session shared by every endpoint, so pages/items/users reuse 
+        keep-alive connections instead of paying a fresh TCP/TLS handshake per request.
+        """
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,  # hand the final response back so raise_for_status() reports it
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+        session.params = {"api_key": self.__EMBY_API_KEY}
+        return session
+    
+    
+    def _get(self, path: str, params: Optional[dict] = None) -> requests.Response:
+        """
+        GET an Emby endpoint through the pooled session. 
+        
+        Args:
+            path (str): Endpoint path relative to BASE_DOMAIN, e.g. "/Users/Query"
+            params (dict): Optional, query parameters (api_key is added by the session)
+        """
+        return self._session.get(f"{self.__BASE_DOMAIN}{path}", params=params, timeout=self._timeout)
+    
+    
+    def close(self):
+        """Close the pooled session and release its connections"""
+        self._session.close()
+    
     
     def _default_item_fields(self) -> str:
         """
@@ -50,7 +128,7 @@ class EmbyConnector:
 
         
     def ping_server(self): 
-        ping_res = requests.get(f"{self.__BASE_DOMAIN}/System/Ping?api_key={self.__EMBY_API_KEY}")
+        ping_res = self._get("/System/Ping")
         if not ping_res.ok:
             if self._debug: print(f"Error: Emby server at {self.__BASE_DOMAIN} is unavailable. Status code: {ping_res.status_code}", file=sys.stderr)
             exit(1)
@@ -60,11 +138,11 @@ class EmbyConnector:
     
     def get_default_user_id(self) -> str:
         """
-        Get first available user ID
+        Get first available user ID (served from the user directory cache)
         """
-        users = self.get_all_emby_users()
+        users = self._get_user_directory()
         if users:
-            return list(users.values())[0]
+            return next(iter(users.values()))
         raise Exception("No users found")
     
     
@@ -72,8 +150,7 @@ class EmbyConnector:
         """
         Returns a dict {folder_name: folder_id} for top-level media folders.
         """
-        url = f"{self.__BASE_DOMAIN}/Library/MediaFolders"
-        r = requests.get(url, params={"api_key": self.__EMBY_API_KEY}, timeout=30)
+        r = self._get("/Library/MediaFolders")
         r.raise_for_status()
         data = r.json()
         out = {}
@@ -93,21 +170,84 @@ class EmbyConnector:
         Returns:
             dict: Item metadata from Emby API
         """
-        response = requests.get(
-            f"{self.__BASE_DOMAIN}/Users/{self.get_default_user_id()}/Items/{item_id}?api_key={self.__EMBY_API_KEY}"
-        )
+        response = self._get(f"/Users/{self.get_default_user_id()}/Items/{item_id}")
         response.raise_for_status()
         return response.json()
+    
+    
+    def get_items_metadata(self, item_ids: Iterable[str], batch_size: int = 100, fields: Optional[str] = None) -> Dict[str, dict]:
+        """
+        Fetch metadata for many items at once, using the comma-separated `Ids` filter on /Users/{id}/Items
+        
+        Args:
+            item_ids (Iterable[str]): Emby item IDs to resolve (duplicates are ignored)
+            batch_size (int, optional): Max number of IDs per request, keeps URLs a sane length - DEFAULT: 100
+            fields (str, optional): Comma-separated Fields list, defaults to _default_item_fields()
+        
+        Returns:
+            dict: key = item ID, value = item metadata. IDs Emby doesn't return are omitted
+        """
+        unique_ids = list(dict.fromkeys(str(i) for i in item_ids))
+        user_id = self.get_default_user_id()
+        out: Dict[str, dict] = {}
+        
+        for i in range(0, len(unique_ids), batch_size):
+            batch = unique_ids[i:i + batch_size]
+            response = self._get(
+                f"/Users/{user_id}/Items",
+                params={"Ids": ",".join(batch), "Fields": fields or self._default_item_fields()},
+            )
+            response.raise_for_status()
+            for item in response.json().get("Items", []):
+                out[str(item.get("Id"))] = item
+        
+        if self._debug: print(f"[EmbyConnector] Resolved metadata for {len(out)}/{len(unique_ids)} items in {-(-len(unique_ids) // batch_size)} requests")
+        return out
         
     
-    def get_all_emby_users(self) -> dict[str, str]:
+    def get_all_emby_users(self, refresh: bool = False) -> dict[str, str]:
         """
-        Fetch all Emby users (including hidden users)
+        Fetch all Emby users (including hidden users). Served from the user directory cache while it is 
+        younger than `user_cache_ttl`.
+        
+        Args:
+            refresh (bool, optional): Bypass the cache and re-fetch the user list from Emby
 
         Returns:
             dictionary: key = username, value = user ID
         """
-        response = requests.get(f"{self.__BASE_DOMAIN}/Users/Query?IsHidden=true&api_key={self.__EMBY_API_KEY}")
+        # hand out a copy so callers can't mutate the cache
+        return dict(self._get_user_directory(refresh))
+    
+    
+    def refresh_user_cache(self) -> dict[str, str]:
+        """
+        Force a re-fetch of the Emby user directory, e.g. after adding/removing users on the server
+        
+        Returns:
+            dictionary: key = username, value = user ID
+        """
+        return self.get_all_emby_users(refresh=True)
+    
+    
+    def _get_user_directory(self, refresh: bool = False) -> Dict[str, str]:
+        """
+        Returns the cached {username: user_id} directory, re-fetching /Users/Query when expired or refresh=True
+        """
+        with self._user_cache_lock:
+            expired = (time.monotonic() - self._user_cache_fetched_at) > self._user_cache_ttl
+            if refresh or expired or self._user_cache is None:
+                self._user_cache = self._fetch_emby_users()
+                self._user_cache_fetched_at = time.monotonic()
+                if self._debug: print(f"[EmbyConnector] User directory cache refreshed ({len(self._user_cache)} users)")
+            return self._user_cache
+    
+    
+    def _fetch_emby_users(self) -> Dict[str, str]:
+        """
+        Fetch all Emby users (including hidden users) straight from /Users/Query, bypassing the cache
+        """
+        response = self._get("/Users/Query", params={"IsHidden": "true"})
         response.raise_for_status()
         
         users_data: T_EmbyUsersResponse = response.json()
@@ -128,26 +268,97 @@ class EmbyConnector:
         Returns:
             dict: The user's watch history data as a JSON-decoded dictionary
         """
-        return requests.get(f"{self.__BASE_DOMAIN}/user_usage_stats/UserPlaylist?user_id={user_id}&aggregate_data={is_aggregated}&days={num_days}&api_key={self.__EMBY_API_KEY}").json()
+        response = self._get(
+            "/user_usage_stats/UserPlaylist",
+            params={"user_id": user_id, "aggregate_data": is_aggregated, "days": num_days},
+        )
+        response.raise_for_status()
+        return response.json()
     
     
-    def get_all_watch_hist(self, num_days: int, is_aggregated=False) -> T_EmbyAllUserWatchHist:
+    def get_all_watch_hist(
+        self,
+        num_days: int,
+        is_aggregated=False,
+        max_workers: int = 4,
+        days_by_user_id: Optional[Dict[str, int]] = None,
+    ) -> T_EmbyAllUserWatchHist:
         """
-        Fetch watch history for all Emby users. Uses get_all_emby_users()
+        Fetch watch history for all Emby users. Uses get_all_emby_users() (cached user directory)
+        
+        Users are fetched concurrently, so the total time tracks the slowest user rather than the sum of all of them. 
+        Per-user request latency (seconds) is kept in `last_watch_hist_latencies` after each call.
+        Holds every user's history in memory at once - prefer iter_all_watch_hist() for bulk loads.
+        
         Args:
             num_days (int): The number of days of watch history to fetch
             is_aggregated (bool, optional): Whether to aggregate the data, defaults to False
+            max_workers (int, optional): Max number of users fetched at once, defaults to 4 (1 = serial)
+            days_by_user_id (dict, optional): Per-user override of num_days, keyed by user ID (used by incremental syncs)
         Returns:
             dict: Keys = username, values = T_EmbyUserWatchHistResponse for that user
         """
-        # get all users, loop through and fetch watch history for each user, build dictionary of results
+        results = dict(self.iter_all_watch_hist(num_days, is_aggregated, max_workers, days_by_user_id))
+        
+        # keep the user directory's ordering regardless of completion order
+        return {username: results[username] for username in self.get_all_emby_users() if username in results}
+    
+    
+    def iter_all_watch_hist(
+        self,
+        num_days: int,
+        is_aggregated=False,
+        max_workers: int = 4,
+        days_by_user_id: Optional[Dict[str, int]] = None,
+    ) -> Iterator[Tuple[str, T_EmbyUserWatchHistResponse]]:
+        """
+        Stream watch history for all Emby users, yielding (username, events) as each user's request completes.
+        
+        At most `max_workers` users are in flight at any time and each user's events are handed to the caller as 
+        soon as they arrive, so only a handful of users' histories are ever held in memory.
+        Per-user request latency (seconds) is kept in `last_watch_hist_latencies` once the stream is exhausted.
+        
+        Args:
+            num_days (int): The number of days of watch history to fetch
+            is_aggregated (bool, optional): Whether to aggregate the data, defaults to False
+            max_workers (int, optional): Max number of users fetched at once, defaults to 4 (1 = serial)
+            days_by_user_id (dict, optional): Per-user override of num_days, keyed by user ID (used by incremental syncs)
+        Yields:
+            tuple: (username, T_EmbyUserWatchHistResponse) in completion order
+        """
         users = self.get_all_emby_users()
-        all_watch_hist: T_EmbyAllUserWatchHist = {}
-        for username, user_id in users.items():
-            watch_data = self.get_user_watch_hist(user_id, num_days)
-            all_watch_hist[username] = watch_data
+        latencies: Dict[str, float] = {}
+        started = time.perf_counter()
         
-        return all_watch_hist
+        def _fetch(username: str, user_id: str) -> Tuple[str, T_EmbyUserWatchHistResponse, float]:
+            t0 = time.perf_counter()
+            user_days = (days_by_user_id or {}).get(user_id, num_days)
+            watch_data = self.get_user_watch_hist(user_id, user_days, is_aggregated)
+            return username, watch_data, time.perf_counter() - t0
+        
+        pending_users = iter(users.items())
+        in_flight: set[Future] = set()
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="emby-watch-hist")
+        try:
+            # bounded window: top up to max_workers requests, hand back whichever finishes first
+            for username, user_id in islice(pending_users, max(1, max_workers)):
+                in_flight.add(executor.submit(_fetch, username, user_id))
+            
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for username, user_id in islice(pending_users, len(done)):
+                    in_flight.add(executor.submit(_fetch, username, user_id))
+                
+                for future in done:
+                    username, watch_data, elapsed = future.result()
+                    latencies[username] = elapsed
+                    if self._debug: print(f"[EmbyConnector] Watch history for {username}: {len(watch_data)} events in {elapsed:.2f}s")
+                    yield username, watch_data
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        self.last_watch_hist_latencies = latencies
+        if self._debug: print(f"[EmbyConnector] Fetched watch history for {len(users)} users in {time.perf_counter() - started:.2f}s")
     
     
     def get_items_page(
@@ -158,24 +369,28 @@ class EmbyConnector:
     parent_id: Optional[str] = None,
     fields: Optional[str] = None,
     recursive: bool = True,
+    min_date_last_saved: Optional[str] = None,
 ) -> dict:
         """
         Fetch a single page from Emby /Items.
         Returns the parsed JSON dict (QueryResult<BaseItemDto>) with Items[] and TotalRecordCount.
+        
+        `fields=""` requests no extra fields (bare Id/Name/Type), `min_date_last_saved` (ISO 8601, UTC) limits the 
+        page to items added or modified since then.
         """
-        url = f"{self.__BASE_DOMAIN}/Items"
         params = {
             "IncludeItemTypes": ",".join(include_item_types),
             "Recursive": "true" if recursive else "false",
-            "Fields": fields or self._default_item_fields(),
+            "Fields": self._default_item_fields() if fields is None else fields,
             "StartIndex": start_index,
             "Limit": limit,
-            "api_key": self.__EMBY_API_KEY,
         }
         if parent_id:
             params["ParentId"] = parent_id
+        if min_date_last_saved:
+            params["MinDateLastSaved"] = min_date_last_saved
 
-        r = requests.get(url, params=params, timeout=30)
+        r = self._get("/Items", params=params)
         r.raise_for_status()
         return r.json()
 
@@ -187,22 +402,35 @@ class EmbyConnector:
         page_size: int = 1000,
         fields: Optional[str] = None,
         recursive: bool = True,
+        prefetch_workers: int = 0,
+        min_date_last_saved: Optional[str] = None,
     ) -> Iterable[dict]:
         """
         Yields every item (Movie + Episode by default) across the library, paging until complete.
+        
+        Args:
+            prefetch_workers (int): Optional, when > 0 the remaining pages are fetched concurrently by this many 
+                worker threads once the first page reveals TotalRecordCount. Pages are requested at the first page's 
+                item count, so a server capping Limit below page_size doesn't leave gaps. Items are still yielded in 
+                page order, and at most `prefetch_workers + 1` pages are in flight/buffered at any time. A page shorter 
+                than expected (library changed mid-sync) raises RuntimeError. DEFAULT: 0 (sequential)
+            min_date_last_saved (str): Optional, ISO 8601 UTC timestamp - only yield items added or modified since 
+                then (Emby's MinDateLastSaved filter), for delta syncs. DEFAULT: None (whole library)
         """
+        fetch_page = partial(
+            self.get_items_page,
+            limit=page_size,
+            include_item_types=include_item_types,
+            parent_id=parent_id,
+            fields=fields,
+            recursive=recursive,
+            min_date_last_saved=min_date_last_saved,
+        )
         start = 0
         total = None
 
         while True:
-            page = self.get_items_page(
-                start_index=start,
-                limit=page_size,
-                include_item_types=include_item_types,
-                parent_id=parent_id,
-                fields=fields,
-                recursive=recursive,
-            )
+            page = fetch_page(start_index=start)
             items = page.get("Items", [])
             if total is None:
                 total = page.get("TotalRecordCount", 0)
@@ -215,4 +443,62 @@ class EmbyConnector:
                 break
             start += got
             
+            # first page gave us the total, so the remaining offsets are known up front. Step by what the server actually 
+            # returned, not page_size: servers that cap Limit (e.g. at 500) would otherwise have gaps between the pages
+            if prefetch_workers > 0:
+                yield from self._iter_pages_concurrently(fetch_page, range(start, total, got), prefetch_workers)
+                break
+    
+    
+    def iter_all_item_ids(
+        self,
+        include_item_types: Tuple[str, ...] = ("Movie", "Episode"),
+        parent_id: Optional[str] = None,
+        page_size: int = 10000,
+    ) -> Iterator[str]:
+        """
+        Yields the Id of every item in the library without any extra fields, a cheap full scan used to detect 
+        items deleted from Emby (see SQLiteConnector.sync_library_items()).
+        """
+        for item in self.iter_all_items(include_item_types, parent_id, page_size, fields=""):
+            yield str(item.get("Id"))
+    
+    
+    def _iter_pages_concurrently(self, fetch_page: Callable[..., dict], offsets: range, workers: int) -> Iterator[dict]:
+        """
+        Fetch pages at the given StartIndex offsets on a thread pool, yielding their items in offset order.
+        
+        Every page must hold `offsets.step` items (the last one up to `offsets.stop`); a shorter page would silently 
+        skip items, so it raises RuntimeError instead.
+        
+        New pages are only submitted as the consumer drains earlier ones. The next page is submitted before the current 
+        one is yielded, so at most `workers + 1` pages are held at once (`workers` in flight plus the one being consumed).
+        """
+        offsets_iter = iter(offsets)
+        in_flight: Deque[Tuple[int, Future]] = deque()
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="emby-items")
+        try:
+            for offset in islice(offsets_iter, workers):
+                in_flight.append((offset, executor.submit(fetch_page, start_index=offset)))
+
+            while in_flight:
+                offset, future = in_flight.popleft()
+                page = future.result()
+                # refill the window before handing items to the consumer so the pool stays busy
+                next_offset = next(offsets_iter, None)
+                if next_offset is not None:
+                    in_flight.append((next_offset, executor.submit(fetch_page, start_index=next_offset)))
+                
+                items = page.get("Items", [])
+                expected = min(offsets.step, offsets.stop - offset)
+                if len(items) < expected:
+                    raise RuntimeError(
+                        f"[EmbyConnector] Short /Items page at StartIndex {offset}: got {len(items)}, expected {expected} "
+                        f"(library changed mid-sync?)"
+                    )
+                yield from items
+        finally:
+            # consumer stopped early (or a page failed): drop anything not yet started
+            executor.shutdown(wait=False, cancel_futures=True)
+            
         
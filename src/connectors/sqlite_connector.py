@@ -1,14 +1,25 @@
-from itertools import islice
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+import queue
 import sqlite3
 import sys
+import threading
+import time
 from typing import Optional, Final
 import os
-from typing import Callable, Dict
+from typing import Callable, Dict, Iterable, Iterator, Sequence, Union
 import zlib
-from custom_types import T_EmbyAllUserWatchHist, T_TMDBGenres
-from datetime import datetime, timedelta
+import hashlib
+import json
+from custom_types import T_EmbyAllUserWatchHist, T_EmbyUserWatchHistItem, T_EmbyUserWatchHistStream, T_TMDBGenres
+from datetime import datetime, timedelta, timezone
+import numpy as np
 import pandas as pd
 
+#: read_*/iter_* output: DataFrame ("pandas"), {column: ndarray} ("numpy") or pyarrow.Table ("arrow")
+T_ReadResult = Union[pd.DataFrame, Dict[str, np.ndarray], "pyarrow.Table"]
+
 
 class SQLiteConnector:
     """
@@ -19,17 +30,258 @@ class SQLiteConnector:
     Attributes:
         _connection (Optional[sqlite3.Connection]): The database connection object. Method 'connect_db()' must be executed to obtain this object.
         cursor (sqlite3.Cursor): DB cursor used to execute queries. Method 'connect_db()' must be executed to set the cursor.
+        _read_pool (queue.LifoQueue): Idle read-only connections handed out by 'read_connection()', separate from the single writer connection.
+        _read_cache (OrderedDict): LRU cache of read results, keyed by query + parameters and dropped whenever the `data_version` counter moves.
     
     ---
     
-    TODO: Consider placing table names into a class-global structure?\n
-    TODO: store database fetches into memory cache?   
+    TODO: Consider placing table names into a class-global structure?
     """
     _cursor: Optional[sqlite3.Cursor]
     _connection: Optional[sqlite3.Connection]
+    
+    # when Emby watch history timezone was corrected from PDT to Melbourne (UTC+10)
+    TIMEZONE_CUTOFF: Final = datetime.strptime("2025-08-15 11:10:00", "%Y-%m-%d %H:%M:%S")
+    # raw watch event timestamp corrections, as (from, until, offset_hours): events reported at from <= time < until 
+    # are shifted by offset_hours. None = open-ended, first matching rule wins. Override per instance via `timezone_rules`
+    TIMEZONE_RULES: Final = (
+        (None, TIMEZONE_CUTOFF, 17),    # reported as PDT (UTC-7): +17 hours to Melbourne (UTC+10)
+    )
+    # how far back a full (or first-time) watch history fetch reaches
+    WATCH_HIST_MAX_DAYS: Final = 2000
+    # named PRAGMA sets applied by connect_db(): https://www.sqlite.org/pragma.html
+    # WAL lets readers (analytics, recommenders) query while the nightly refresh writes, and with synchronous = NORMAL 
+    # a commit no longer waits on fsync, so bulk loads are fast without switching durability off mid-session
+    CONNECTION_PROFILES: Final = {
+        # long-running writes: nightly refresh, full rebuilds
+        "bulk_load": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -262144,          # negative = KiB, so 256MB of page cache
+            "mmap_size": 1073741824,        # 1GB memory-mapped reads
+            "temp_store": "MEMORY",         # temp tables/indexes (sorts, touched pairs) stay in RAM
+            "wal_autocheckpoint": 10000,    # fewer checkpoints during large transactions
+            "busy_timeout": 30000,
+        },
+        # default: mixed reads and small writes
+        "serving": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -65536,
+            "mmap_size": 268435456,
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000,
+        },
+        # query-only access, opened with mode=ro (journal mode is a property of the file, set by the writer)
+        "read_only": {
+            "query_only": "ON",
+            "cache_size": -65536,
+            "mmap_size": 268435456,
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000,
+        },
+    }
+    # per-user affinity rollups: table -> (label table, label id column, label name column)
+    AFFINITY_ROLLUPS: Final = {
+        "user_genre_affinity": ("item_genres", "genre_id", "genre_name"),
+        "user_tag_affinity": ("item_tags", "tag_id", "tag_name"),
+    }
+    # an item's affinity weight halves when it was last watched this many days before the user's latest watch
+    AFFINITY_RECENCY_HALF_LIFE_DAYS: Final = 180
+    # typed read API (read_*/iter_* methods): per dataset, the FROM clause, the filter columns and 
+    # column -> (SQL expression, dtype). dtypes: "object" (str), "int64", "Int64" (nullable int), "float64", 
+    # "datetime64[s]" (selected as epoch seconds), "list[str]"/"list[int]" (selected as char(31)-joined text)
+    READ_DATASETS: Final = {
+        "user_item_stats": {
+            "from": """watch_hist_user_item_stats_data st
+                JOIN watch_hist_users u ON u.user_key = st.user_key
+                JOIN watch_hist_items i ON i.item_key = st.item_key""",
+            "user_column": "u.user_id",
+            "time_column": "st.last_watched_epoch",
+            "item_type_column": "i.item_type",
+            "item_column": "i.item_id",
+            "columns": {
+                "user_id": ("u.user_id", "object"),
+                "item_id": ("i.item_id", "object"),
+                "item_name": ("i.item_name", "object"),
+                "item_type": ("i.item_type", "object"),
+                "total_sessions": ("st.total_sessions", "int64"),
+                "total_seconds_watched": ("st.total_seconds_watched", "int64"),
+                "total_minutes_watched": ("st.total_minutes_watched", "float64"),
+                "best_completion_ratio": ("st.best_completion_ratio", "float64"),
+                "average_completion_ratio": ("st.average_completion_ratio", "float64"),
+                "rewatch_count": ("st.rewatch_count", "int64"),
+                "first_watched_timestamp": ("st.first_watched_epoch", "datetime64[s]"),
+                "last_watched_timestamp": ("st.last_watched_epoch", "datetime64[s]"),
+                "days_between_first_last": ("st.days_between_first_last", "float64"),
+                "adherence_score": ("st.adherence_score", "float64"),
+                "completed_sessions": ("st.completed_sessions", "int64"),
+                "partial_sessions": ("st.partial_sessions", "int64"),
+                "abandoned_sessions": ("st.abandoned_sessions", "int64"),
+                "sampled_sessions": ("st.sampled_sessions", "int64"),
+                "last_updated_timestamp": ("st.last_updated_epoch", "datetime64[s]"),
+            },
+        },
+        "sessions": {
+            "from": """watch_hist_agg_sessions_data s
+                JOIN watch_hist_users u ON u.user_key = s.user_key
+                JOIN watch_hist_items i ON i.item_key = s.item_key""",
+            "user_column": "u.user_id",
+            "time_column": "s.session_end_epoch",
+            "item_type_column": "i.item_type",
+            "item_column": "i.item_id",
+            "columns": {
+                "session_id": ("s.session_id", "int64"),
+                "user_id": ("u.user_id", "object"),
+                "item_id": ("i.item_id", "object"),
+                "item_name": ("i.item_name", "object"),
+                "item_type": ("i.item_type", "object"),
+                "session_start_timestamp": ("s.session_start_epoch", "datetime64[s]"),
+                "session_end_timestamp": ("s.session_end_epoch", "datetime64[s]"),
+                "session_span_minutes": ("s.session_span_minutes", "Int64"),
+                "total_seconds_watched": ("s.total_seconds_watched", "int64"),
+                "session_count": ("s.session_count", "int64"),
+                "completion_ratio": ("s.completion_ratio", "float64"),
+                "outcome": ("s.outcome", "object"),
+            },
+        },
+        "library_items": {
+            "from": "library_items l",
+            "user_column": None,
+            "time_column": None,
+            "item_type_column": "l.item_type",
+            "item_column": "l.item_id",
+            "columns": {
+                "item_id": ("l.item_id", "object"),
+                "item_name": ("l.item_name", "object"),
+                "item_type": ("l.item_type", "object"),
+                "series_name": ("l.series_name", "object"),
+                "series_id": ("l.series_id", "object"),
+                "season_number": ("l.season_number", "Int64"),
+                "episode_number": ("l.episode_number", "Int64"),
+                "runtime_seconds": ("l.runtime_seconds", "Int64"),
+                "runtime_minutes": ("l.runtime_minutes", "float64"),
+                "premiere_date": ("l.premiere_date", "object"),
+                "date_created": ("l.date_created", "object"),
+                "overview": ("l.overview", "object"),
+                "community_rating": ("l.community_rating", "float64"),
+                "production_year": ("l.production_year", "Int64"),
+                "file_path": ("l.file_path", "object"),
+                "container": ("l.container", "object"),
+                "video_codec": ("l.video_codec", "object"),
+                "resolution_width": ("l.resolution_width", "Int64"),
+                "resolution_height": ("l.resolution_height", "Int64"),
+                # genres[i] / genre_ids[i] are the same item_genres row: both read the rows in insert order, and NULLs are 
+                # kept as '' placeholders (None in the list) so neither list skips an entry
+                "genres": (
+                    "(SELECT group_concat(COALESCE(g.genre_name, ''), char(31)) FROM "
+                    "(SELECT genre_name FROM item_genres WHERE item_id = l.item_id ORDER BY uuid) g)", "list[str]",
+                ),
+                "genre_ids": (
+                    "(SELECT group_concat(COALESCE(g.genre_id, ''), char(31)) FROM "
+                    "(SELECT genre_id FROM item_genres WHERE item_id = l.item_id ORDER BY uuid) g)", "list[int]",
+                ),
+                "tags": ("(SELECT group_concat(t.tag_name, char(31)) FROM item_tags t WHERE t.item_id = l.item_id)", "list[str]"),
+            },
+        },
+        "user_series_stats": {
+            "from": """watch_hist_user_series_stats ss
+                JOIN watch_hist_users u ON u.user_key = ss.user_key""",
+            "user_column": "u.user_id",
+            "time_column": "ss.last_watched_epoch",
+            "item_type_column": None,
+            "item_column": "ss.series_id",
+            "columns": {
+                "user_id": ("u.user_id", "object"),
+                "series_id": ("ss.series_id", "object"),
+                "series_name": ("ss.series_name", "object"),
+                "episodes_watched": ("ss.episodes_watched", "int64"),
+                "episodes_completed": ("ss.episodes_completed", "int64"),
+                "episodes_available": ("ss.episodes_available", "Int64"),
+                "watched_ratio": ("ss.watched_ratio", "float64"),
+                "total_sessions": ("ss.total_sessions", "int64"),
+                "total_seconds_watched": ("ss.total_seconds_watched", "int64"),
+                "active_days": ("ss.active_days", "int64"),
+                "binge_velocity": ("ss.binge_velocity", "float64"),
+                "dropoff_season_number": ("ss.dropoff_season_number", "Int64"),
+                "dropoff_episode_number": ("ss.dropoff_episode_number", "Int64"),
+                "caught_up": ("ss.caught_up", "int64"),
+                "first_watched_timestamp": ("ss.first_watched_epoch", "datetime64[s]"),
+                "last_watched_timestamp": ("ss.last_watched_epoch", "datetime64[s]"),
+                "last_updated_timestamp": ("ss.last_updated_epoch", "datetime64[s]"),
+            },
+        },
+        "user_genre_affinity": {
+            "from": """user_genre_affinity a
+                JOIN watch_hist_users u ON u.user_key = a.user_key""",
+            "user_column": "u.user_id",
+            "time_column": None,
+            "item_type_column": None,
+            "item_column": None,
+            "columns": {
+                "user_id": ("u.user_id", "object"),
+                "genre_name": ("a.genre_name", "object"),
+                "genre_id": ("a.genre_id", "Int64"),
+                "affinity_score": ("a.affinity_score", "float64"),
+                "affinity_share": ("a.affinity_share", "float64"),
+                "item_count": ("a.item_count", "int64"),
+                "total_seconds_watched": ("a.total_seconds_watched", "int64"),
+                "last_watched_timestamp": ("a.last_watched_epoch", "datetime64[s]"),
+            },
+        },
+        "user_tag_affinity": {
+            "from": """user_tag_affinity a
+                JOIN watch_hist_users u ON u.user_key = a.user_key""",
+            "user_column": "u.user_id",
+            "time_column": None,
+            "item_type_column": None,
+            "item_column": None,
+            "columns": {
+                "user_id": ("u.user_id", "object"),
+                "tag_name": ("a.tag_name", "object"),
+                "tag_id": ("a.tag_id", "Int64"),
+                "affinity_score": ("a.affinity_score", "float64"),
+                "affinity_share": ("a.affinity_share", "float64"),
+                "item_count": ("a.item_count", "int64"),
+                "total_seconds_watched": ("a.total_seconds_watched", "int64"),
+                "last_watched_timestamp": ("a.last_watched_epoch", "datetime64[s]"),
+            },
+        },
+    }
 
-    def __init__(self, DB_NAME: str, debug=False):
+    def __init__(
+        self,
+        DB_NAME: str,
+        debug=False,
+        timezone_rules: Optional[Sequence[tuple]] = None,
+        read_pool_size: int = 4,
+        read_cache_size: int = 256,
+        cache_check_interval: float = 1.0,
+    ):
         self._debug = debug
+        self._timezone_rules = self._compile_timezone_rules(self.TIMEZONE_RULES if timezone_rules is None else timezone_rules)
+        
+        # read-only connection pool, opened lazily by read_connection()
+        self._read_pool_size = max(1, read_pool_size)
+        self._read_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._read_pool_opened = 0
+        self._read_pool_lock = threading.Lock()
+        
+        # LRU read cache (0 disables it), see _cached_read()
+        self._read_cache_size = max(0, read_cache_size)
+        self._read_cache: "OrderedDict[tuple, object]" = OrderedDict()
+        self._read_cache_lock = threading.Lock()
+        self._read_cache_version: Optional[int] = None       # data_version the cached entries were read at
+        self._cache_check_interval = cache_check_interval
+        self._data_version: Optional[int] = None             # last data_version read from pipeline_state
+        self._data_version_checked_at: Optional[float] = None
+        self._data_version_bumped = False                    # set by _bump_data_version(), cache cleared by _commit()
+        self._read_cache_generation = 0                      # incremented by clear_read_cache()
+        # {hits, misses} of the read cache since the connector was created
+        self.read_cache_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+        
+        # {items, inserted, updated, unchanged, pruned, elapsed_seconds, write_seconds, items_per_second} for the most recent ingest_all_library_items() call
+        self.last_ingest_stats: Dict[str, float] = {}
         
         if DB_NAME is None or DB_NAME == '':
             print("[SQliteConnector] ERROR: DB_NAME environment variable is not set! Check the .env file at the root of the project.", file=sys.stderr)
@@ -37,18 +289,29 @@ class SQLiteConnector:
         os.makedirs("sqlite_db", exist_ok=True)    # hardcoded on purpose to enforce consistent directories, also helps manage gitignore if DB name is different from default
         self.__DB_DIR: Final = os.path.join("sqlite_db", DB_NAME)
         
-    def connect_db(self) -> bool:
+    def connect_db(self, profile: str = "serving") -> bool:
         """
         Attempts to connect to the DB, and grab both the cursor and connector objects
         
+        Args:
+            profile (str, optional): Name of the CONNECTION_PROFILES entry to apply: "bulk_load" (nightly refresh / 
+                rebuilds), "serving" (mixed reads and writes) or "read_only" (opened with mode=ro) - DEFAULT: "serving"
+        
         Returns:
             bool: True if successful, False if not
         """
+        if profile not in self.CONNECTION_PROFILES:
+            raise ValueError(f"Unknown connection profile '{profile}', expected one of {list(self.CONNECTION_PROFILES)}")
+        
         try:
-            self._connection = sqlite3.connect(self.__DB_DIR)
+            if profile == "read_only":
+                self._connection = sqlite3.connect(self._read_only_uri(), uri=True)
+            else:
+                self._connection = sqlite3.connect(self.__DB_DIR)
+            self._apply_connection_profile(self._connection, profile)
             # check db is actually connected and reachable
             self._connection.execute("SELECT 1;")
-            if self._debug: print("DB connection tested and successful!")
+            if self._debug: print(f"DB connection tested and successful! (profile: {profile})")
         except sqlite3.Error as e:
             print(f"[SQliteConnector] ERROR: Database connection failed: {e}", file=sys.stderr)
             self._connection = None
@@ -58,6 +321,86 @@ class SQLiteConnector:
         self._cursor = self._connection.cursor()
         return True
     
+    def close(self) -> None:
+        """Closes the writer connection (checkpointing its WAL) and every idle read-only connection"""
+        self.close_read_pool()
+        if getattr(self, "_connection", None) is not None:
+            self._connection.close()
+        self._connection = None
+        self._cursor = None
+    
+    def _apply_connection_profile(self, connection: sqlite3.Connection, profile: str) -> None:
+        """
+        Applies the PRAGMAs of a CONNECTION_PROFILES entry to `connection`. Must run before any transaction is opened.
+        """
+        for pragma, value in self.CONNECTION_PROFILES[profile].items():
+            result = connection.execute(f"PRAGMA {pragma} = {value}").fetchone()
+            # journal_mode reports the mode actually in effect (e.g. WAL is unavailable on some network filesystems)
+            if pragma == "journal_mode" and result is not None and str(result[0]).lower() != str(value).lower():
+                print(f"[SQliteConnector] WARNING: journal_mode {value} not available, using {result[0]}", file=sys.stderr)
+    
+    def _read_only_uri(self) -> str:
+        """URI opening the database file with mode=ro (SQLite itself rejects any write)"""
+        return f"{Path(self.__DB_DIR).resolve().as_uri()}?mode=ro"
+    
+    @contextmanager
+    def read_connection(self, timeout: Optional[float] = None) -> Iterator[sqlite3.Connection]:
+        """
+        Checks out a read-only connection from the pool for the duration of the `with` block.
+        
+        Connections are opened lazily (up to `read_pool_size`) with the "read_only" profile and can be used from any 
+        thread, one thread at a time. Readers never share the writer's `_connection`/`_cursor`, and with WAL they keep 
+        reading the last committed data while a refresh is writing.
+        
+        Args:
+            timeout (float, optional): Seconds to wait for a free connection when all are checked out - DEFAULT: wait forever
+        
+        Raises:
+            TimeoutError: No connection became free within `timeout`
+        """
+        connection = self._checkout_read_connection(timeout)
+        try:
+            yield connection
+        finally:
+            self._read_pool.put(connection)
+    
+    def _checkout_read_connection(self, timeout: Optional[float]) -> sqlite3.Connection:
+        try:
+            return self._read_pool.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._read_pool_lock:
+            can_open = self._read_pool_opened < self._read_pool_size
+            if can_open:
+                self._read_pool_opened += 1
+        if can_open:
+            try:
+                connection = sqlite3.connect(self._read_only_uri(), uri=True, check_same_thread=False)
+                self._apply_connection_profile(connection, "read_only")
+            except sqlite3.Error:
+                with self._read_pool_lock:
+                    self._read_pool_opened -= 1
+                raise
+            if self._debug: print(f"[SQLiteConnector] Opened read-only connection {self._read_pool_opened}/{self._read_pool_size}")
+            return connection
+        
+        try:
+            return self._read_pool.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No read-only connection became free within {timeout}s (pool size {self._read_pool_size})")
+    
+    def close_read_pool(self) -> None:
+        """Closes every idle read-only connection. Connections still checked out return to the pool when released."""
+        while True:
+            try:
+                connection = self._read_pool.get_nowait()
+            except queue.Empty:
+                break
+            connection.close()
+            with self._read_pool_lock:
+                self._read_pool_opened -= 1
+    
     def _extract_video_codec(self, item_data: dict) -> str:
         """
         Extract video codec from MediaStreams
@@ -67,41 +410,110 @@ class SQLiteConnector:
                 return stream.get('Codec', '')
         return ''
     
-    def prune_missing_items(self, current_ids: set[str]) -> int:
+    def prune_missing_items(self, current_ids: Iterable[str]) -> int:
         """
         Delete library rows not in current_ids. Returns rows deleted, or -1 if error. 
+        
+        The current ids are bulk-loaded into a temp table, so finding and deleting the missing items (and their 
+        genre/tag/provider rows) are a handful of anti-join statements inside SQLite.
         """
         if self._connection is None or self._cursor is None:
             print("[SQLiteConnector] ERROR: DB not connected", file=sys.stderr)
             return -1
 
-        # Coerce to str to avoid int-vs-str mismatches
-        current_ids = {str(i) for i in current_ids}
-
-        self._connection.execute("BEGIN")
-        self._cursor.execute("SELECT item_id FROM library_items")
-        existing = {str(row[0]) for row in self._cursor.fetchall()}
-
-        to_delete = existing - current_ids
-        if to_delete:
-            # Optional: chunk to avoid huge parameter lists
-            def chunks(iterable, size=500):
-                it = iter(iterable)
-                while True:
-                    batch = list(islice(it, size))
-                    if not batch:
-                        break
-                    yield batch
-
-            for batch in chunks(to_delete, 500):
-                self._cursor.executemany("DELETE FROM item_provider_ids WHERE item_id = ?", [(i,) for i in batch])
-                self._cursor.executemany("DELETE FROM item_genres       WHERE item_id = ?", [(i,) for i in batch])
-                self._cursor.executemany("DELETE FROM item_tags         WHERE item_id = ?", [(i,) for i in batch])
-                self._cursor.executemany("DELETE FROM library_items     WHERE item_id = ?", [(i,) for i in batch])
+        try:
+            self._cursor.execute("DROP TABLE IF EXISTS temp.current_library_ids")
+            self._cursor.execute("DROP TABLE IF EXISTS temp.missing_library_ids")
+            self._cursor.execute("CREATE TEMP TABLE current_library_ids (item_id TEXT PRIMARY KEY) WITHOUT ROWID")
+            # Coerce to str to avoid int-vs-str mismatches
+            self._cursor.executemany(
+                "INSERT OR IGNORE INTO temp.current_library_ids (item_id) VALUES (?)", ((str(i),) for i in current_ids)
+            )
+            
+            # anti-join: stored items Emby no longer has
+            self._cursor.execute("""
+                CREATE TEMP TABLE missing_library_ids AS
+                SELECT item_id FROM library_items
+                WHERE item_id NOT IN (SELECT item_id FROM temp.current_library_ids)
+            """)
+            deleted = self._cursor.execute("SELECT COUNT(*) FROM temp.missing_library_ids").fetchone()[0]
+            if deleted:
+                for table in ("item_provider_ids", "item_genres", "item_tags", "library_items"):
+                    self._cursor.execute(f"DELETE FROM {table} WHERE item_id IN (SELECT item_id FROM temp.missing_library_ids)")
+                # rollups over the library (user affinity, series stats) fully rebuild on their next refresh
+                self._set_pipeline_state("library_last_prune_epoch", int(time.time()))
+                self._bump_data_version()
+            
+            self._commit()
+        except sqlite3.Error as e:
+            print(f"[SQLiteConnector] ERROR pruning library items: {e}", file=sys.stderr)
+            self._connection.rollback()
+            return -1
+        finally:
+            self._cursor.execute("DROP TABLE IF EXISTS temp.current_library_ids")
+            self._cursor.execute("DROP TABLE IF EXISTS temp.missing_library_ids")
+        
+        return deleted
 
+    
+    
+    def _ensure_pipeline_state_schema(self):
+        """
+        Creates (if doesn't exist) the `pipeline_state` key/value table, used to store watermarks for incremental refreshes
+        """
+        self._cursor.execute("""
+            CREATE TABLE IF NOT EXISTS pipeline_state (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                updated_timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    
+    def _get_pipeline_state(self, key: str) -> Optional[str]:
+        """
+        Returns the stored value for a `pipeline_state` key, or None if it has never been set
+        """
+        self._ensure_pipeline_state_schema()
+        row = self._cursor.execute("SELECT value FROM pipeline_state WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+    
+    def _set_pipeline_state(self, key: str, value) -> None:
+        """
+        Upserts a `pipeline_state` value. Does NOT commit, so it lands in the caller's transaction
+        """
+        self._ensure_pipeline_state_schema()
+        self._cursor.execute("""
+            INSERT INTO pipeline_state (key, value, updated_timestamp) VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_timestamp = excluded.updated_timestamp
+        """, (key, None if value is None else str(value)))
+    
+    def _bump_data_version(self) -> None:
+        """
+        Moves the `data_version` counter in `pipeline_state` forward. Called by every ingest/refresh method that changed 
+        data. Does NOT commit, so readers see the new version together with the new data; the caller commits with 
+        `_commit()`, which then drops this process' read cache.
+        
+        The counter never goes below the current time in microseconds, so a database rebuilt from scratch and published 
+        over this one never reuses a version a reader has already cached.
+        """
+        self._ensure_pipeline_state_schema()
+        self._cursor.execute("""
+            INSERT INTO pipeline_state (key, value, updated_timestamp) VALUES ('data_version', ?1, CURRENT_TIMESTAMP)
+            ON CONFLICT(key) DO UPDATE SET 
+                value = MAX(CAST(value AS INTEGER) + 1, ?1), 
+                updated_timestamp = excluded.updated_timestamp
+        """, (time.time_ns() // 1000,))
+        self._data_version_bumped = True
+    
+    def _commit(self) -> None:
+        """
+        Commits the writer's transaction, then drops the read cache if the transaction bumped the data version. Clearing 
+        only after the commit means no read in this process can re-cache pre-commit data under the new version.
+        """
         self._connection.commit()
-        return len(to_delete)
-
+        if self._data_version_bumped:
+            self._data_version_bumped = False
+            self.clear_read_cache()
     
     
     # ====================================================================== User Watch History Tables ======================================================================
@@ -110,16 +522,27 @@ class SQLiteConnector:
         """
         Creates (if doesn't exist) the full schema/tables for the user watch history data.
         
+        Users and items are stored once in dictionary tables with INTEGER surrogate keys, and the event/session/stats 
+        tables reference those keys instead of repeating 32-char TEXT ids and names on every row. All timestamps are 
+        stored as INTEGER epoch seconds (`*_epoch` columns), so window functions, range filters and indexes never parse 
+        strings. Views under the original table names join the ids and names back in and format the timestamps as text, 
+        so existing read queries keep working. Databases using an older layout are migrated in place 
+        (see `_migrate_watch_hist_to_surrogate_keys` and `_migrate_watch_hist_to_epoch_timestamps`).
+        
         NOTE: Requires the `library_items` table to exist. DB connection **must be active**.
         
         ---
         Tables: 
         
-        `watch_hist_raw_events` (user watch hist verbatum from the Emby API)
+        `watch_hist_users` / `watch_hist_items` (user_key/item_key dictionaries for the Emby ids and names)
         
-        `watch_hist_agg_sessions` (Aggregated user sessions)
+        `watch_hist_raw_events_data` (user watch hist verbatum from the Emby API) - view: `watch_hist_raw_events`
         
-        `watch_hist_user_item_stats` (user-specific stats for their watched items)
+        `watch_hist_agg_sessions_data` (Aggregated user sessions) - view: `watch_hist_agg_sessions`
+        
+        `watch_hist_user_item_stats_data` (user-specific stats for their watched items) - view: `watch_hist_user_item_stats`
+        
+        `watch_hist_sync_state` (per-user high-water marks for incremental syncs)
         """
 
         # check db connection and cursor actually exist
@@ -130,58 +553,70 @@ class SQLiteConnector:
             if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found when attempting to create schema!", file=sys.stderr)
             return False
 
-        # TABLE: watch_hist_raw_events
+        # TABLE: watch_hist_users
+        SCHEMA_watch_hist_users = """
+            CREATE TABLE IF NOT EXISTS watch_hist_users(
+                user_key INTEGER PRIMARY KEY,
+                user_id TEXT NOT NULL UNIQUE,
+                user_name TEXT
+            )"""
+        
+        # TABLE: watch_hist_items
+        SCHEMA_watch_hist_items = """
+            CREATE TABLE IF NOT EXISTS watch_hist_items(
+                item_key INTEGER PRIMARY KEY,
+                item_id TEXT NOT NULL UNIQUE,
+                item_name TEXT,
+                item_type TEXT
+            )"""
+        
+        # TABLE: watch_hist_raw_events_data
         SCHEMA_watch_hist_raw_events = """
-            CREATE TABLE IF NOT EXISTS watch_hist_raw_events(
+            CREATE TABLE IF NOT EXISTS watch_hist_raw_events_data(
                 row_id INTEGER PRIMARY KEY AUTOINCREMENT, 
-                date TEXT NOT NULL, 
-                time TEXT NOT NULL, 
-                user_id TEXT NOT NULL,
-                item_name TEXT NOT NULL,
-                item_id TEXT NOT NULL,
-                item_type TEXT NOT NULL,
+                user_key INTEGER NOT NULL REFERENCES watch_hist_users(user_key),
+                item_key INTEGER NOT NULL REFERENCES watch_hist_items(item_key),
+                event_epoch INTEGER NOT NULL,   -- normalised event time as seconds since 1970-01-01 00:00:00 (local wall-clock)
                 duration INTEGER NOT NULL,
-                remote_address TEXT,
-                user_name TEXT NOT NULL
+                remote_address TEXT
             )"""
         
-        #TABLE: watch_hist_agg_sessions
+        #TABLE: watch_hist_agg_sessions_data
         SCHEMA_watch_hist_agg_sessions = """
-            CREATE TABLE IF NOT EXISTS watch_hist_agg_sessions(
+            CREATE TABLE IF NOT EXISTS watch_hist_agg_sessions_data(
                 session_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                item_id TEXT NOT NULL,
-                session_start_timestamp TEXT NOT NULL,
-                session_end_timestamp TEXT NOT NULL,
+                user_key INTEGER NOT NULL REFERENCES watch_hist_users(user_key),
+                item_key INTEGER NOT NULL REFERENCES watch_hist_items(item_key),
+                session_start_epoch INTEGER NOT NULL,
+                session_end_epoch INTEGER NOT NULL,
                 session_span_minutes INTEGER,
                 total_seconds_watched INTEGER NOT NULL,
                 session_count INTEGER NOT NULL,
                 completion_ratio REAL,
                 outcome TEXT,
-                created_timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id, item_id, session_start_timestamp),
-                FOREIGN KEY (item_id) REFERENCES library_items(item_id)
+                created_epoch INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),     -- UTC
+                UNIQUE(user_key, item_key, session_start_epoch)
             )
         """
         
-        #TABLE: watch_hist_user_item_stats
+        #TABLE: watch_hist_user_item_stats_data
         SCHEMA_watch_hist_user_item_stats = """
-            CREATE TABLE IF NOT EXISTS watch_hist_user_item_stats (
+            CREATE TABLE IF NOT EXISTS watch_hist_user_item_stats_data (
                 stat_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                item_id TEXT NOT NULL,
+                user_key INTEGER NOT NULL REFERENCES watch_hist_users(user_key),
+                item_key INTEGER NOT NULL REFERENCES watch_hist_items(item_key),
                 total_sessions INTEGER NOT NULL DEFAULT 0,
                 total_seconds_watched INTEGER NOT NULL DEFAULT 0,
                 total_minutes_watched REAL GENERATED ALWAYS AS (total_seconds_watched / 60.0),
                 best_completion_ratio REAL DEFAULT 0,
                 average_completion_ratio REAL DEFAULT 0,
                 rewatch_count INTEGER DEFAULT 0,
-                first_watched_timestamp TEXT,
-                last_watched_timestamp TEXT,
+                first_watched_epoch INTEGER,
+                last_watched_epoch INTEGER,
                 days_between_first_last INTEGER GENERATED ALWAYS AS (
                     CASE 
-                        WHEN first_watched_timestamp = last_watched_timestamp THEN 0
-                        ELSE JULIANDAY(last_watched_timestamp) - JULIANDAY(first_watched_timestamp)
+                        WHEN first_watched_epoch = last_watched_epoch THEN 0
+                        ELSE (last_watched_epoch - first_watched_epoch) / 86400.0
                     END
                 ),
                 adherence_score REAL DEFAULT 0,
@@ -189,22 +624,132 @@ class SQLiteConnector:
                 partial_sessions INTEGER DEFAULT 0,
                 abandoned_sessions INTEGER DEFAULT 0,
                 sampled_sessions INTEGER DEFAULT 0,
-                last_updated_timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id, item_id),
-                FOREIGN KEY (item_id) REFERENCES library_items(item_id)
+                last_updated_epoch INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),    -- UTC
+                UNIQUE(user_key, item_key)
+            )
+        """
+        #TABLE: watch_hist_sync_state
+        SCHEMA_watch_hist_sync_state = """
+            CREATE TABLE IF NOT EXISTS watch_hist_sync_state (
+                user_id TEXT PRIMARY KEY,
+                user_name TEXT,
+                last_event_timestamp TEXT,      -- high-water mark: latest (normalised) event stored for the user
+                last_synced_timestamp TEXT DEFAULT CURRENT_TIMESTAMP
             )
         """
+        
+        # VIEWS: original table names and (text timestamp) columns for readers, with the keys and epochs appended
+        VIEW_watch_hist_raw_events = """
+            CREATE VIEW IF NOT EXISTS watch_hist_raw_events AS
+            SELECT 
+                e.row_id, date(e.event_epoch, 'unixepoch') AS date, time(e.event_epoch, 'unixepoch') AS time, 
+                u.user_id, i.item_name, i.item_id, i.item_type, e.duration, e.remote_address, u.user_name, 
+                e.event_epoch, e.user_key, e.item_key
+            FROM watch_hist_raw_events_data e
+            JOIN watch_hist_users u ON u.user_key = e.user_key
+            JOIN watch_hist_items i ON i.item_key = e.item_key
+        """
+        VIEW_watch_hist_agg_sessions = """
+            CREATE VIEW IF NOT EXISTS watch_hist_agg_sessions AS
+            SELECT 
+                s.session_id, u.user_id, i.item_id, 
+                datetime(s.session_start_epoch, 'unixepoch') AS session_start_timestamp, 
+                datetime(s.session_end_epoch, 'unixepoch') AS session_end_timestamp, 
+                s.session_span_minutes, s.total_seconds_watched, s.session_count, s.completion_ratio, s.outcome, 
+                datetime(s.created_epoch, 'unixepoch') AS created_timestamp, 
+                s.user_key, s.item_key, s.session_start_epoch, s.session_end_epoch, s.created_epoch
+            FROM watch_hist_agg_sessions_data s
+            JOIN watch_hist_users u ON u.user_key = s.user_key
+            JOIN watch_hist_items i ON i.item_key = s.item_key
+        """
+        VIEW_watch_hist_user_item_stats = """
+            CREATE VIEW IF NOT EXISTS watch_hist_user_item_stats AS
+            SELECT 
+                st.stat_id, u.user_id, i.item_id, st.total_sessions, st.total_seconds_watched, st.total_minutes_watched, 
+                st.best_completion_ratio, st.average_completion_ratio, st.rewatch_count, 
+                datetime(st.first_watched_epoch, 'unixepoch') AS first_watched_timestamp, 
+                datetime(st.last_watched_epoch, 'unixepoch') AS last_watched_timestamp, 
+                st.days_between_first_last, st.adherence_score, st.completed_sessions, st.partial_sessions, 
+                st.abandoned_sessions, st.sampled_sessions, 
+                datetime(st.last_updated_epoch, 'unixepoch') AS last_updated_timestamp, 
+                st.user_key, st.item_key, st.first_watched_epoch, st.last_watched_epoch, st.last_updated_epoch
+            FROM watch_hist_user_item_stats_data st
+            JOIN watch_hist_users u ON u.user_key = st.user_key
+            JOIN watch_hist_items i ON i.item_key = st.item_key
+        """
         try:
+            # databases created before the surrogate keys hold the TEXT-keyed tables under the view names
+            legacy_tables = [
+                name for (name,) in self._cursor.execute("""
+                    SELECT name FROM sqlite_master 
+                    WHERE type = 'table' AND name IN ('watch_hist_raw_events', 'watch_hist_agg_sessions', 'watch_hist_user_item_stats')
+                """).fetchall()
+            ]
+            # keyed tables created before the epoch columns still store TEXT timestamps
+            text_timestamp_tables = [
+                name for name in ("watch_hist_raw_events_data", "watch_hist_agg_sessions_data", "watch_hist_user_item_stats_data")
+                if {"date", "session_start_timestamp", "first_watched_timestamp"} & {
+                    row[1] for row in self._cursor.execute(f"PRAGMA table_info({name})").fetchall()
+                }
+            ]
+            if legacy_tables or text_timestamp_tables:
+                if not self._connection.in_transaction:
+                    self._cursor.execute("BEGIN")
+                # views are recreated over the new columns, and the index names are freed up for the new tables
+                for view in ("watch_hist_raw_events", "watch_hist_agg_sessions", "watch_hist_user_item_stats"):
+                    if view not in legacy_tables:
+                        self._cursor.execute(f"DROP VIEW IF EXISTS {view}")
+                old_tables = legacy_tables + text_timestamp_tables
+                for (index_name,) in self._cursor.execute(
+                    f"""SELECT name FROM sqlite_master 
+                    WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({', '.join('?' * len(old_tables))})""",
+                    old_tables,
+                ).fetchall():
+                    self._cursor.execute(f"DROP INDEX {index_name}")
+                for table in text_timestamp_tables:
+                    self._cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_text")
+            
             # create tables
+            self._cursor.execute(SCHEMA_watch_hist_users)
+            self._cursor.execute(SCHEMA_watch_hist_items)
             self._cursor.execute(SCHEMA_watch_hist_raw_events)
             self._cursor.execute(SCHEMA_watch_hist_agg_sessions)
             self._cursor.execute(SCHEMA_watch_hist_user_item_stats)
+            self._cursor.execute(SCHEMA_watch_hist_sync_state)
             
-            # indexes for each table
-            self._cursor.execute("CREATE INDEX IF NOT EXISTS idx_watch_hist_raw_user_time ON watch_hist_raw_events(user_id, date, time DESC)")
-            self._cursor.execute("CREATE INDEX IF NOT EXISTS idx_watch_hist_agg_sessions ON watch_hist_agg_sessions(user_id, session_end_timestamp DESC)")
-            self._cursor.execute("CREATE INDEX IF NOT EXISTS idx_watch_hist_agg_item ON watch_hist_agg_sessions(item_id)")
-            self._cursor.execute("CREATE INDEX IF NOT EXISTS idx_watch_hist_user_item_stats ON watch_hist_user_item_stats(user_id, adherence_score DESC)")
+            # indexes for each table, covering the columns each access pattern reads so the table rows aren't touched
+            # natural key for raw events, so incremental syncs can re-fetch overlapping days idempotently
+            self._cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_watch_hist_raw_natural_key ON watch_hist_raw_events_data(user_key, item_key, event_epoch)")
+            # per-user recent events
+            self._cursor.execute("CREATE INDEX IF NOT EXISTS idx_watch_hist_raw_user_time ON watch_hist_raw_events_data(user_key, event_epoch DESC, item_key, duration)")
+            # sessionization: partition + order + duration
+            self._cursor.execute("CREATE INDEX IF NOT EXISTS idx_watch_hist_raw_user_item_epoch ON watch_hist_raw_events_data(user_key, item_key, event_epoch, duration)")
+            # per-user recent sessions
+            self._cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_watch_hist_agg_sessions ON watch_hist_agg_sessions_data(
+                    user_key, session_end_epoch DESC, item_key, session_start_epoch, total_seconds_watched, completion_ratio, outcome
+                )""")
+            # per-item sessions (who watched this, and how far)
+            self._cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_watch_hist_agg_item ON watch_hist_agg_sessions_data(
+                    item_key, session_end_epoch DESC, user_key, total_seconds_watched, completion_ratio, outcome
+                )""")
+            # incremental stats refresh: pairs with sessions created since the last update
+            self._cursor.execute("CREATE INDEX IF NOT EXISTS idx_watch_hist_agg_created ON watch_hist_agg_sessions_data(created_epoch, user_key, item_key)")
+            # per-user top adherence
+            self._cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_watch_hist_user_item_stats ON watch_hist_user_item_stats_data(
+                    user_key, adherence_score DESC, item_key, total_sessions, best_completion_ratio, last_watched_epoch
+                )""")
+            
+            if legacy_tables:
+                self._migrate_watch_hist_to_surrogate_keys(legacy_tables)
+            if text_timestamp_tables:
+                self._migrate_watch_hist_to_epoch_timestamps(text_timestamp_tables)
+            
+            self._cursor.execute(VIEW_watch_hist_raw_events)
+            self._cursor.execute(VIEW_watch_hist_agg_sessions)
+            self._cursor.execute(VIEW_watch_hist_user_item_stats)
             
             self._connection.commit()
             
@@ -212,18 +757,158 @@ class SQLiteConnector:
             
         except sqlite3.Error as e:
             if self._debug: print(f"[SQLiteConnector] ERROR: Failed to create user watch history schemas: {e}", file=sys.stderr)
+            self._connection.rollback()
             return False    
         
         return True
 # ----------------------------------
 
+    def _migrate_watch_hist_to_surrogate_keys(self, legacy_tables: Sequence[str]) -> None:
+        """
+        Copies the TEXT-keyed watch history tables (pre surrogate keys) into the keyed `*_data` tables, then drops them 
+        so the compatibility views can take their names. Row, session and stat ids are kept, so the incremental 
+        sessionization watermark stays valid. Natural-key duplicates in old raw event tables are dropped (first row wins).
+        
+        Does NOT commit, runs inside the caller's transaction.
+        
+        Args:
+            legacy_tables (Sequence[str]): Which of the old tables exist
+        """
+        if self._debug: print(f"[SQLiteConnector] Migrating {', '.join(legacy_tables)} to integer user/item keys")
+        
+        if "watch_hist_raw_events" in legacy_tables:
+            raw_columns = {row[1] for row in self._cursor.execute("PRAGMA table_info(watch_hist_raw_events)").fetchall()}
+            # event_epoch was added after the first databases were created: derive it from the text timestamps
+            event_epoch = "r.event_epoch" if "event_epoch" in raw_columns else "CAST(strftime('%s', r.date || ' ' || r.time) AS INTEGER)"
+            
+            self._cursor.execute("""
+                INSERT OR IGNORE INTO watch_hist_users (user_id, user_name)
+                SELECT user_id, MAX(user_name) FROM watch_hist_raw_events GROUP BY user_id
+            """)
+            self._cursor.execute("""
+                INSERT OR IGNORE INTO watch_hist_items (item_id, item_name, item_type)
+                SELECT item_id, MAX(item_name), MAX(item_type) FROM watch_hist_raw_events GROUP BY item_id
+            """)
+            self._cursor.execute(f"""
+                INSERT OR IGNORE INTO watch_hist_raw_events_data 
+                (row_id, user_key, item_key, event_epoch, duration, remote_address)
+                SELECT r.row_id, u.user_key, i.item_key, {event_epoch}, r.duration, r.remote_address
+                FROM watch_hist_raw_events r
+                JOIN watch_hist_users u ON u.user_id = r.user_id
+                JOIN watch_hist_items i ON i.item_id = r.item_id
+                ORDER BY r.row_id
+            """)
+        
+        # sessions/stats may reference users and items whose raw events are gone
+        for table in ("watch_hist_agg_sessions", "watch_hist_user_item_stats"):
+            if table not in legacy_tables:
+                continue
+            self._cursor.execute(f"INSERT OR IGNORE INTO watch_hist_users (user_id) SELECT DISTINCT user_id FROM {table}")
+            self._cursor.execute(f"""
+                INSERT OR IGNORE INTO watch_hist_items (item_id, item_name, item_type)
+                SELECT DISTINCT t.item_id, l.item_name, l.item_type
+                FROM {table} t
+                LEFT JOIN library_items l ON l.item_id = t.item_id
+            """)
+        
+        if "watch_hist_agg_sessions" in legacy_tables:
+            self._cursor.execute("""
+                INSERT OR IGNORE INTO watch_hist_agg_sessions_data 
+                (session_id, user_key, item_key, session_start_epoch, session_end_epoch, session_span_minutes, 
+                total_seconds_watched, session_count, completion_ratio, outcome, created_epoch)
+                SELECT 
+                    s.session_id, u.user_key, i.item_key, 
+                    CAST(strftime('%s', s.session_start_timestamp) AS INTEGER), CAST(strftime('%s', s.session_end_timestamp) AS INTEGER), 
+                    s.session_span_minutes, s.total_seconds_watched, s.session_count, s.completion_ratio, s.outcome, 
+                    CAST(strftime('%s', s.created_timestamp) AS INTEGER)
+                FROM watch_hist_agg_sessions s
+                JOIN watch_hist_users u ON u.user_id = s.user_id
+                JOIN watch_hist_items i ON i.item_id = s.item_id
+            """)
+        
+        if "watch_hist_user_item_stats" in legacy_tables:
+            self._cursor.execute("""
+                INSERT OR IGNORE INTO watch_hist_user_item_stats_data 
+                (stat_id, user_key, item_key, total_sessions, total_seconds_watched, best_completion_ratio, 
+                average_completion_ratio, rewatch_count, first_watched_epoch, last_watched_epoch, adherence_score, 
+                completed_sessions, partial_sessions, abandoned_sessions, sampled_sessions, last_updated_epoch)
+                SELECT 
+                    st.stat_id, u.user_key, i.item_key, st.total_sessions, st.total_seconds_watched, st.best_completion_ratio, 
+                    st.average_completion_ratio, st.rewatch_count, 
+                    CAST(strftime('%s', st.first_watched_timestamp) AS INTEGER), CAST(strftime('%s', st.last_watched_timestamp) AS INTEGER), 
+                    st.adherence_score, st.completed_sessions, st.partial_sessions, st.abandoned_sessions, st.sampled_sessions, 
+                    CAST(strftime('%s', st.last_updated_timestamp) AS INTEGER)
+                FROM watch_hist_user_item_stats st
+                JOIN watch_hist_users u ON u.user_id = st.user_id
+                JOIN watch_hist_items i ON i.item_id = st.item_id
+            """)
+        
+        for table in legacy_tables:
+            self._cursor.execute(f"DROP TABLE {table}")
+# ----------------------------------
+
+    def _migrate_watch_hist_to_epoch_timestamps(self, text_timestamp_tables: Sequence[str]) -> None:
+        """
+        Copies keyed `*_data` tables that still store TEXT timestamps (renamed to `<table>_text` by the caller) into 
+        the INTEGER epoch layout, then drops them. Ids are kept, so the incremental watermarks stay valid.
+        
+        Does NOT commit, runs inside the caller's transaction.
+        
+        Args:
+            text_timestamp_tables (Sequence[str]): Which `*_data` tables were renamed
+        """
+        if self._debug: print(f"[SQLiteConnector] Migrating {', '.join(text_timestamp_tables)} to epoch timestamps")
+        
+        if "watch_hist_raw_events_data" in text_timestamp_tables:
+            self._cursor.execute("""
+                INSERT OR IGNORE INTO watch_hist_raw_events_data 
+                (row_id, user_key, item_key, event_epoch, duration, remote_address)
+                SELECT row_id, user_key, item_key, event_epoch, duration, remote_address
+                FROM watch_hist_raw_events_data_text
+                ORDER BY row_id
+            """)
+        
+        if "watch_hist_agg_sessions_data" in text_timestamp_tables:
+            self._cursor.execute("""
+                INSERT OR IGNORE INTO watch_hist_agg_sessions_data 
+                (session_id, user_key, item_key, session_start_epoch, session_end_epoch, session_span_minutes, 
+                total_seconds_watched, session_count, completion_ratio, outcome, created_epoch)
+                SELECT 
+                    session_id, user_key, item_key, 
+                    CAST(strftime('%s', session_start_timestamp) AS INTEGER), CAST(strftime('%s', session_end_timestamp) AS INTEGER), 
+                    session_span_minutes, total_seconds_watched, session_count, completion_ratio, outcome, 
+                    CAST(strftime('%s', created_timestamp) AS INTEGER)
+                FROM watch_hist_agg_sessions_data_text
+            """)
+        
+        if "watch_hist_user_item_stats_data" in text_timestamp_tables:
+            self._cursor.execute("""
+                INSERT OR IGNORE INTO watch_hist_user_item_stats_data 
+                (stat_id, user_key, item_key, total_sessions, total_seconds_watched, best_completion_ratio, 
+                average_completion_ratio, rewatch_count, first_watched_epoch, last_watched_epoch, adherence_score, 
+                completed_sessions, partial_sessions, abandoned_sessions, sampled_sessions, last_updated_epoch)
+                SELECT 
+                    stat_id, user_key, item_key, total_sessions, total_seconds_watched, best_completion_ratio, 
+                    average_completion_ratio, rewatch_count, 
+                    CAST(strftime('%s', first_watched_timestamp) AS INTEGER), CAST(strftime('%s', last_watched_timestamp) AS INTEGER), 
+                    adherence_score, completed_sessions, partial_sessions, abandoned_sessions, sampled_sessions, 
+                    CAST(strftime('%s', last_updated_timestamp) AS INTEGER)
+                FROM watch_hist_user_item_stats_data_text
+            """)
+        
+        for table in text_timestamp_tables:
+            self._cursor.execute(f"DROP TABLE {table}_text")
+# ----------------------------------
+
     def _INIT_DROP_user_watch_hist_schemas(self) -> bool:
         """
         **DROP** all user watch history tables
 
         ---
         Tables:
-        `watch_hist_raw_events` - `watch_hist_agg_sessions` - `watch_hist_user_item_stats`
+        `watch_hist_raw_events` - `watch_hist_agg_sessions` - `watch_hist_user_item_stats` (views and `*_data` tables) - 
+        `watch_hist_sync_state` - `watch_hist_users` - `watch_hist_items` - `user_genre_affinity` - `user_tag_affinity` - 
+        `watch_hist_user_series_stats`
         """
         
         # check db connection and cursor actually exist
@@ -235,9 +920,18 @@ class SQLiteConnector:
             return False
         
         try:
-            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_raw_events")
-            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_agg_sessions")
-            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_user_item_stats")
+            self._cursor.execute("DROP VIEW IF EXISTS watch_hist_raw_events")
+            self._cursor.execute("DROP VIEW IF EXISTS watch_hist_agg_sessions")
+            self._cursor.execute("DROP VIEW IF EXISTS watch_hist_user_item_stats")
+            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_raw_events_data")
+            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_agg_sessions_data")
+            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_user_item_stats_data")
+            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_sync_state")
+            for table in self.AFFINITY_ROLLUPS:
+                self._cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_user_series_stats")
+            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_users")
+            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_items")
             
             if self._debug: print("[SQLiteConnector] Watch history schemas DROPPED successfully!")
             return True
@@ -246,16 +940,23 @@ class SQLiteConnector:
             return False 
 # -----------------------        
         
-    def _INIT_POPULATE_watch_hist_raw_events(self, emby_watch_hist_func: Callable[[int, bool], T_EmbyAllUserWatchHist]) -> bool:
+    def _INIT_POPULATE_watch_hist_raw_events(
+        self,
+        emby_watch_hist_func: Callable[[int, bool], T_EmbyAllUserWatchHist | T_EmbyUserWatchHistStream],
+        chunk_size: int = 5000,
+    ) -> bool:
         """
         **WARNING: THIS WILL FIRST DROP ALL DATA IN THE `watch_hist_raw_events` TABLE**
         
         Populates the watch_hist_raw_events table rows with the all available historical data from the Emby API. 
         
-        NOTE: handles the timezone cutoff where Playback Reporting switched from PDT to Melbourne time.
+        NOTE: handles the timezone cutoff where Playback Reporting switched from PDT to Melbourne time (see TIMEZONE_RULES).
         
         Args:
-            emby_watch_hist_func (() -> T_EmbyUserWatchHistResponse): Emby connector function that fetches all user watch history
+            emby_watch_hist_func (Callable): Emby connector function that fetches all user watch history. Prefer 
+                EmbyConnector.iter_all_watch_hist (yields per user, so inserts start while later users are still 
+                downloading); EmbyConnector.get_all_watch_hist (dict of all users) is also accepted
+            chunk_size (int, optional): Number of events buffered before each bulk insert - DEFAULT: 5000
         """
         
         if self._connection is None:
@@ -265,92 +966,282 @@ class SQLiteConnector:
             if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found!", file=sys.stderr)
             return False
         
-        # start fresh with clean table
+        # start fresh with clean table (the user/item dictionaries are kept, so existing sessions/stats keys stay valid)
         try:
-            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_raw_events")
+            self._INIT_create_user_watch_hist_schemas()     # migrates old TEXT-keyed tables first
+            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_raw_events_data")
+            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_sync_state")
             self._INIT_create_user_watch_hist_schemas()
+            # row ids restart with the new table, so every event counts as new for incremental sessionization
+            self._set_pipeline_state("sessions_last_raw_row_id", 0)
+            self._connection.commit()
         except sqlite3.Error as e:
             if self._debug: print(f"[SQLiteConnector] ERROR: Failed to DROP watch_hist_raw_events table: {e}", file=sys.stderr)
             return False 
-        
-        # when Emby watch history timezone was corrected from PDT to Melbourne (UTC+10)
-        TIMEZONE_CUTOFF = datetime.strptime("2025-08-15 11:10:00", "%Y-%m-%d %H:%M:%S")
             
         if self._debug: 
             print("[SQLiteConnector] Fetching watch history from Emby for all users")
-            print(f"[SQLiteConnector] Will adjust PDT timestamps before {TIMEZONE_CUTOFF} to Melbourne time (+17 hours)")
+            for rule_from, rule_until, offset_hours, _, _ in self._timezone_rules:
+                print(f"[SQLiteConnector] Will shift timestamps from {rule_from or 'the start'} until {rule_until or 'now'} by {offset_hours:+g} hours")
             
         
         # TODO: how to better handle the number of days of watch history to fetch? e.g. exp backfill
-        # prep raw data for bulk insert -> transform into tuples for better insertion
-        # see the watch_hist_raw_events schema for reference as to how the table is structured
-        all_usr_hist = emby_watch_hist_func(2000, False)
-        raw_events_data = []
-        
-        for username, data in all_usr_hist.items():
-            for event in data:
-                event_date = event["date"]
-                event_time = event['time']
-                
-                # check if event is before cutoff
-                event_datetime = datetime.strptime(f"{event_date} {event_time}", "%Y-%m-%d %H:%M:%S")
-                
-                # if before the cutoff, it's assumed PDT timezone
-                if event_datetime < TIMEZONE_CUTOFF:
-                    # + 17 hours to convert PDT (UTC-7) to Melbourne (UTC+10)
-                    adjusted_datetime = event_datetime + timedelta(hours=17)
-                    normalized_date = adjusted_datetime.strftime("%Y-%m-%d")
-                    normalized_time = adjusted_datetime.strftime("%H:%M:%S")
-                    
-                    if self._debug and len(raw_events_data) < 3:  # Show first few adjustments
-                        print(f"  Adjusted PDT→MEL: {event_date} {event_time} → {normalized_date} {normalized_time}")
-                else:
-                    # already in Melbourne time, use as-is
-                    normalized_date = event_date
-                    normalized_time = event_time
-                
-                raw_events_data.append([
-                    normalized_date,
-                    normalized_time,
-                    event['user_id'],
-                    event['item_name'],
-                    event['item_id'],
-                    event['item_type'],
-                    int(event['duration']),
-                    event.get('remote_address', ''),
-                    event['user_name']
-                ])
-            
-            if self._debug:
-                print(f"  Found {len(data)} events for user: {username}")
+        return self._insert_watch_hist_raw_events(emby_watch_hist_func(self.WATCH_HIST_MAX_DAYS, False), chunk_size)
+# -----------------------
+
+
+    def sync_watch_hist_raw_events(
+        self,
+        emby_watch_hist_func: Callable[..., T_EmbyAllUserWatchHist | T_EmbyUserWatchHistStream],
+        overlap_days: int = 2,
+        max_days: Optional[int] = None,
+        chunk_size: int = 5000,
+    ) -> bool:
+        """
+        Incrementally syncs `watch_hist_raw_events` with the Emby API, without dropping the table.
+        
+        Each user's high-water mark (latest event timestamp) is kept in `watch_hist_sync_state`; only the days since 
+        that mark (plus `overlap_days`) are requested. Users without a mark get the full `max_days` of history. 
+        Events are deduplicated on their natural key (user, item, event time), so reruns are idempotent.
+        
+        Args:
+            emby_watch_hist_func (Callable): EmbyConnector.iter_all_watch_hist (or get_all_watch_hist), called as 
+                `func(max_days, False, days_by_user_id={user_id: days})`
+            overlap_days (int, optional): Extra days re-fetched before each high-water mark to catch late events - DEFAULT: 2
+            max_days (int, optional): Days fetched for users that have never been synced - DEFAULT: WATCH_HIST_MAX_DAYS
+            chunk_size (int, optional): Number of events buffered before each bulk insert - DEFAULT: 5000
+        """
+        
+        if self._connection is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database connection not found!", file=sys.stderr)
+            return False
+        if self._cursor is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found!", file=sys.stderr)
+            return False
+        
+        if not self._INIT_create_user_watch_hist_schemas():
+            return False
+        
+        max_days = max_days or self.WATCH_HIST_MAX_DAYS
+        
+        # work out how many days each known user needs, based on their high-water mark
+        now = datetime.now()
+        days_by_user_id: Dict[str, int] = {}
+        for user_id, last_event_timestamp in self._cursor.execute(
+            "SELECT user_id, last_event_timestamp FROM watch_hist_sync_state WHERE last_event_timestamp IS NOT NULL"
+        ).fetchall():
+            last_event = datetime.strptime(last_event_timestamp, "%Y-%m-%d %H:%M:%S")
+            days_by_user_id[user_id] = max(1, min(max_days, (now - last_event).days + 1 + overlap_days))
+        
+        if self._debug: 
+            print(f"[SQLiteConnector] Incremental watch history sync: {len(days_by_user_id)} users with a high-water mark, others fetch {max_days} days")
+        
+        return self._insert_watch_hist_raw_events(
+            emby_watch_hist_func(max_days, False, days_by_user_id=days_by_user_id), chunk_size
+        )
+# -----------------------
+
+
+    def _compile_timezone_rules(self, rules: Sequence[tuple]) -> list[tuple]:
+        """
+        Validates (from, until, offset_hours) timezone rules and pre-computes their bounds as epoch seconds.
+        
+        Bounds may be datetimes, "%Y-%m-%d %H:%M:%S" strings or None (open-ended).
+        
+        Returns:
+            list: (from, until, offset_hours, from_epoch, until_epoch) per rule, with None epochs for open bounds
+        """
+        compiled = []
+        for rule_from, rule_until, offset_hours in rules:
+            compiled.append((rule_from, rule_until, offset_hours, self._to_epoch(rule_from), self._to_epoch(rule_until)))
+        return compiled
+# -----------------------
+
+
+    @staticmethod
+    def _to_epoch(bound: datetime | str | None) -> Optional[int]:
+        """
+        Converts a naive datetime, or a "%Y-%m-%d %H:%M:%S" / "%Y-%m-%d" string, to epoch seconds (None passes through)
+        """
+        if bound is None:
+            return None
+        if isinstance(bound, str):
+            bound = datetime.strptime(bound, "%Y-%m-%d %H:%M:%S" if " " in bound else "%Y-%m-%d")
+        return int((bound - datetime(1970, 1, 1)).total_seconds())
+# -----------------------
+
+
+    def _normalize_watch_hist_events(self, events: Sequence[T_EmbyUserWatchHistItem]) -> list[tuple]:
+        """
+        Transforms a batch of Emby watch events into 
+        (user_id, user_name, item_id, item_name, item_type, event_epoch, duration, remote_address) row tuples.
+        
+        Works on whole columns at once: timestamps are parsed into epoch seconds in one pass and every TIMEZONE_RULES 
+        rule is applied as a boolean mask.
+        """
+        if not events:
+            return []
+        
+        frame = pd.DataFrame.from_records(events, columns=[
+            "date", "time", "user_id", "item_name", "item_id", "item_type", "duration", "remote_address", "user_name",
+        ])
+        raw_epoch = (
+            pd.to_datetime(frame["date"] + " " + frame["time"], format="%Y-%m-%d %H:%M:%S")
+            .to_numpy(dtype="datetime64[s]").astype(np.int64)
+        )
+        
+        # first matching rule wins
+        offsets = np.zeros(len(raw_epoch), dtype=np.int64)
+        unmatched = np.ones(len(raw_epoch), dtype=bool)
+        for _, _, offset_hours, from_epoch, until_epoch in self._timezone_rules:
+            in_rule = unmatched.copy()
+            if from_epoch is not None: in_rule &= raw_epoch >= from_epoch
+            if until_epoch is not None: in_rule &= raw_epoch < until_epoch
+            offsets[in_rule] = int(offset_hours * 3600)
+            unmatched &= ~in_rule
+        event_epoch = raw_epoch + offsets
+        
+        if self._debug and not unmatched.all():
+            first = int(np.argmin(unmatched))
+            adjusted = str(event_epoch[first].astype("datetime64[s]")).replace("T", " ")
+            print(f"  Adjusted {int((~unmatched).sum())} timestamps, e.g. {frame['date'].iat[first]} {frame['time'].iat[first]} → {adjusted}")
+        
+        return list(zip(
+            frame["user_id"].tolist(),
+            frame["user_name"].tolist(),
+            frame["item_id"].tolist(),
+            frame["item_name"].tolist(),
+            frame["item_type"].tolist(),
+            event_epoch.tolist(),
+            frame["duration"].astype(np.int64).tolist(),
+            frame["remote_address"].fillna("").tolist(),
+        ))
+# -----------------------
+
+
+    def _key_watch_hist_rows(
+        self,
+        rows: Sequence[tuple],
+        user_keys: Dict[str, int],
+        item_keys: Dict[str, int],
+    ) -> list[tuple]:
+        """
+        Upserts the users/items of a normalised chunk into the `watch_hist_users`/`watch_hist_items` dictionaries 
+        (latest name wins) and maps the rows to `watch_hist_raw_events_data` insert order. Does NOT commit.
+        
+        Args:
+            rows (Sequence[tuple]): Output of `_normalize_watch_hist_events`
+            user_keys (Dict[str, int]): user_id -> user_key cache, shared across chunks and updated in place
+            item_keys (Dict[str, int]): item_id -> item_key cache, shared across chunks and updated in place
+        """
+        users = {row[0]: row[1] for row in rows}
+        items = {row[2]: (row[3], row[4]) for row in rows}
+        
+        # only rewrite dictionary rows whose names actually changed
+        self._cursor.executemany("""
+            INSERT INTO watch_hist_users (user_id, user_name) VALUES (?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET user_name = excluded.user_name
+            WHERE user_name IS NOT excluded.user_name
+        """, users.items())
+        self._cursor.executemany("""
+            INSERT INTO watch_hist_items (item_id, item_name, item_type) VALUES (?, ?, ?)
+            ON CONFLICT(item_id) DO UPDATE SET item_name = excluded.item_name, item_type = excluded.item_type
+            WHERE item_name IS NOT excluded.item_name OR item_type IS NOT excluded.item_type
+        """, ((item_id, item_name, item_type) for item_id, (item_name, item_type) in items.items()))
+        
+        for ids, keys, lookup_sql in (
+            (users, user_keys, "SELECT user_id, user_key FROM watch_hist_users WHERE user_id IN (SELECT value FROM json_each(?))"),
+            (items, item_keys, "SELECT item_id, item_key FROM watch_hist_items WHERE item_id IN (SELECT value FROM json_each(?))"),
+        ):
+            missing = [key_id for key_id in ids if key_id not in keys]
+            if missing:
+                keys.update(self._cursor.execute(lookup_sql, (json.dumps(missing),)).fetchall())
+        
+        return [
+            (user_keys[user_id], item_keys[item_id], event_epoch, duration, remote_address)
+            for user_id, _, item_id, _, _, event_epoch, duration, remote_address in rows
+        ]
+# -----------------------
+
+
+    def _insert_watch_hist_raw_events(
+        self,
+        watch_hist: T_EmbyAllUserWatchHist | T_EmbyUserWatchHistStream,
+        chunk_size: int = 5000,
+    ) -> bool:
+        """
+        Streams normalised rows into `watch_hist_raw_events` in fixed-size chunks (ignoring natural-key duplicates), 
+        then advances each user's high-water mark in `watch_hist_sync_state`.
+        
+        Only one chunk of events is held at a time, so memory doesn't grow with total history size. Each chunk is 
+        normalised as a whole by `_normalize_watch_hist_events`.
+        
+        Args:
+            watch_hist: (username, events) pairs as they arrive, or a {username: events} dict
+            chunk_size (int): Number of events buffered before each executemany
+        """
+        user_hist_stream = watch_hist.items() if isinstance(watch_hist, dict) else watch_hist
+        insert_sql = """INSERT OR IGNORE INTO watch_hist_raw_events_data 
+                (user_key, item_key, event_epoch, duration, remote_address)
+                VALUES (?, ?, ?, ?, ?)"""
+        # Emby id -> surrogate key, filled as new users/items are seen
+        user_keys: Dict[str, int] = {}
+        item_keys: Dict[str, int] = {}
         
-        # bulk rows insert
+        # bulk rows insert (durability/journal settings come from the connection profile, see connect_db)
         try:
-            # don't wait for data to be fullly written to disk: https://www.sqlite.org/pragma.html#pragma_synchronous
-            self._cursor.execute("PRAGMA synchronous = OFF")
-            # store rollback journal in RAM instead of disk: https://www.sqlite.org/pragma.html#pragma_journal_mode
-            self._cursor.execute("PRAGMA journal_mode = MEMORY")
             # make all inserts an atomic transaction (either all records succeed, or none)
             self._cursor.execute("BEGIN TRANSACTION")
             
-            self._cursor.executemany(
-                """INSERT OR IGNORE INTO watch_hist_raw_events 
-                (date, time, user_id, item_name, item_id, item_type, 
-                    duration, remote_address, user_name)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                raw_events_data
-            )
+            rows_inserted = 0
+            rows_received = 0
+            chunk: list[T_EmbyUserWatchHistItem] = []
+            for username, data in user_hist_stream:
+                for event in data:
+                    chunk.append(event)
+                    if len(chunk) >= chunk_size:
+                        self._cursor.executemany(insert_sql, self._key_watch_hist_rows(
+                            self._normalize_watch_hist_events(chunk), user_keys, item_keys
+                        ))
+                        rows_inserted += self._cursor.rowcount
+                        rows_received += len(chunk)
+                        chunk = []
+                
+                if self._debug:
+                    print(f"  Found {len(data)} events for user: {username}")
             
-            self._connection.commit()
+            if chunk:
+                self._cursor.executemany(insert_sql, self._key_watch_hist_rows(
+                    self._normalize_watch_hist_events(chunk), user_keys, item_keys
+                ))
+                rows_inserted += self._cursor.rowcount
+                rows_received += len(chunk)
             
-            # reset pragmas
-            self._cursor.execute("PRAGMA synchronous = NORMAL")
-            self._cursor.execute("PRAGMA journal_mode = DELETE")
+            # advance per-user high-water marks from what's now stored
+            self._cursor.execute("""
+                INSERT INTO watch_hist_sync_state (user_id, user_name, last_event_timestamp, last_synced_timestamp)
+                SELECT u.user_id, u.user_name, datetime(e.last_event_epoch, 'unixepoch'), CURRENT_TIMESTAMP
+                FROM (
+                    SELECT user_key, MAX(event_epoch) AS last_event_epoch
+                    FROM watch_hist_raw_events_data
+                    GROUP BY user_key
+                ) e
+                JOIN watch_hist_users u ON u.user_key = e.user_key
+                WHERE true
+                ON CONFLICT(user_id) DO UPDATE SET
+                    user_name = excluded.user_name,
+                    last_event_timestamp = excluded.last_event_timestamp,
+                    last_synced_timestamp = excluded.last_synced_timestamp
+            """)
+            if rows_inserted:
+                self._bump_data_version()
+            
+            self._commit()
             
             if self._debug:
-                print(f"[SQLiteConnector] Successfully inserted {len(raw_events_data)} watch events!")
+                print(f"[SQLiteConnector] Successfully inserted {rows_inserted} new watch events ({rows_received - rows_inserted} already stored)!")
                             
-        except sqlite3.Error as e:
+        except Exception as e:  # includes fetch errors raised mid-stream by the generator
             print(f"[SQLiteConnector] ERROR during bulk insert: {e}", file=sys.stderr)
             self._connection.rollback()
             return False
@@ -365,6 +1256,7 @@ class SQLiteConnector:
         completed_ratio_threshold: float = 0.9,
         partial_ratio_threshold: float = 0.25,
         min_sampled_seconds: int = 60,
+        engine: str = "sql",
     ) -> bool:
         """
         **WARNING: THIS WILL FIRST DROP ALL DATA IN THE `watch_hist_agg_sessions` TABLE**
@@ -373,6 +1265,8 @@ class SQLiteConnector:
         
         Args:
             session_segment_minutes (int, optional): Number of minutes to segment watch sessions into - DEFAULT: 15 minute sessions
+            engine (str, optional): "sql" (window-function CTE inside SQLite) or "pandas" (vectorized NumPy/pandas, 
+                see `_sessionize_events_pandas`). Both produce identical sessions - DEFAULT: "sql"
         """
         
         if self._connection is None:
@@ -384,154 +1278,37 @@ class SQLiteConnector:
         
         # start fresh with clean table
         try:
-            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_agg_sessions")
+            self._INIT_create_user_watch_hist_schemas()     # migrates old TEXT-keyed tables first
+            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_agg_sessions_data")
             self._INIT_create_user_watch_hist_schemas()
+            # bulk load without the covering indexes, they're rebuilt in one sorted pass afterwards
+            for index_name in ("idx_watch_hist_agg_sessions", "idx_watch_hist_agg_item", "idx_watch_hist_agg_created"):
+                self._cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
         
             if self._debug:
                 print(f"[SQLiteConnector] Processing raw events into sessions using {session_segment_minutes} minute segments")
                 
-            # convert session segment to fraction of a day for Julian day calculations: https://sqlite.org/lang_datefunc.html
-            session_gap_days = session_segment_minutes / 1440.0  # 1440 minutes in a day
-            completed_t = float(completed_ratio_threshold)
-            partial_t = float(partial_ratio_threshold)
-            min_sample = int(min_sampled_seconds)
-            
-            # below query seems complex but here's a breakdown:
-            # 1. ordered_events: Selects all raw events, formats timestamps, and orders them
-            # 2. session_boundaries: Uses window functions to detect when a new session starts (gap > threshold)
-            # 3. session_groups: Assigns a session group ID to each event by cumulatively summing new session markers
-            # 4. Final SELECT: Aggregates events by session group, calculating session start/end, duration, total watch time, and outcome
-            session_query = f"""
-                INSERT INTO watch_hist_agg_sessions 
-                (user_id, item_id, session_start_timestamp, 
-                session_end_timestamp, session_span_minutes, total_seconds_watched, 
-                session_count, completion_ratio, outcome)
-                WITH ordered_events AS (
-                    -- First, get all events with proper datetime formatting
-                    SELECT 
-                        user_id,
-                        item_id,
-                        item_type,
-                        datetime(date || ' ' || time) as event_timestamp,
-                        duration,
-                        row_id
-                    FROM watch_hist_raw_events
-                    ORDER BY user_id, item_id, date, time
-                ),
-                session_boundaries AS (
-                    -- Identify session boundaries using LAG window function
-                    SELECT 
-                        *,
-                        LAG(event_timestamp) OVER (
-                            PARTITION BY user_id, item_id 
-                            ORDER BY event_timestamp
-                        ) as prev_event_timestamp,
-                        -- Check if gap from previous event > session_segment_minutes
-                        CASE 
-                            WHEN LAG(event_timestamp) OVER (
-                                PARTITION BY user_id, item_id 
-                                ORDER BY event_timestamp
-                            ) IS NULL THEN 1  -- First event is always new session
-                            WHEN julianday(event_timestamp) - julianday(
-                                LAG(event_timestamp) OVER (
-                                    PARTITION BY user_id, item_id 
-                                    ORDER BY event_timestamp
-                                )
-                            ) > {session_gap_days} THEN 1  -- Gap > threshold means new session
-                            ELSE 0
-                        END as is_new_session
-                    FROM ordered_events
-                ),
-                session_groups AS (
-                    -- Assign session IDs using cumulative sum of new session markers
-                    SELECT 
-                        *,
-                        SUM(is_new_session) OVER (
-                            PARTITION BY user_id, item_id 
-                            ORDER BY event_timestamp
-                            ROWS UNBOUNDED PRECEDING
-                        ) as session_group_id
-                    FROM session_boundaries
-                )
-                -- Final aggregation by session
-                SELECT 
-                    user_id,
-                    item_id,
-                    MIN(event_timestamp) as session_start_timestamp,
-                    MAX(event_timestamp) as session_end_timestamp,
-                    CAST(
-                        (julianday(MAX(event_timestamp)) - julianday(MIN(event_timestamp))) * 1440 
-                        AS INTEGER
-                    ) as session_span_minutes,
-                    SUM(duration) as total_seconds_watched,
-                    COUNT(*) as session_count,
-                    -- Compute completion ratio using actual runtime when available
-                    CASE 
-                        WHEN (
-                            SELECT runtime_seconds 
-                            FROM library_items 
-                            WHERE item_id = session_groups.item_id
-                        ) > 0 THEN 
-                            MIN(
-                                1.0, 
-                                SUM(duration) / CAST((
-                                    SELECT runtime_seconds 
-                                    FROM library_items 
-                                    WHERE item_id = session_groups.item_id
-                                ) AS REAL)
-                            )
-                        WHEN MAX(item_type) = 'Episode' THEN 
-                            MIN(1.0, SUM(duration) / 1500.0)  -- Fallback 25 min
-                        WHEN MAX(item_type) = 'Movie' THEN   
-                            MIN(1.0, SUM(duration) / 7200.0)  -- Fallback 2 hours
-                        ELSE NULL
-                    END as completion_ratio,
-                    -- Determine outcome using actual runtime when available
-                    CASE 
-                        WHEN (
-                            SELECT runtime_seconds 
-                            FROM library_items 
-                            WHERE item_id = session_groups.item_id
-                        ) > 0 THEN 
-                            CASE
-                                WHEN SUM(duration) >= {completed_t} * (
-                                    SELECT runtime_seconds 
-                                    FROM library_items 
-                                    WHERE item_id = session_groups.item_id
-                                ) THEN 'completed'
-                                WHEN SUM(duration) >= {partial_t} * (
-                                    SELECT runtime_seconds 
-                                    FROM library_items 
-                                    WHERE item_id = session_groups.item_id
-                                ) THEN 'partial'
-                                WHEN SUM(duration) >= {min_sample} THEN 'sampled'
-                                ELSE 'abandoned'
-                            END
-                        WHEN MAX(item_type) = 'Episode' THEN
-                            CASE
-                                WHEN SUM(duration) >= 1200 THEN 'completed'  -- 20+ min for episodes
-                                WHEN SUM(duration) >= 300 THEN 'partial'     -- 5-20 min
-                                WHEN SUM(duration) >= 60 THEN 'sampled'      -- 1-5 min
-                                ELSE 'abandoned'                              -- <1 min
-                            END
-                        WHEN MAX(item_type) = 'Movie' THEN
-                            CASE
-                                WHEN SUM(duration) >= 5400 THEN 'completed'  -- 90+ min for movies
-                                WHEN SUM(duration) >= 1800 THEN 'partial'    -- 30-90 min
-                                WHEN SUM(duration) >= 300 THEN 'sampled'     -- 5-30 min
-                                ELSE 'abandoned'                              -- <5 min
-                            END
-                        ELSE 'unknown'
-                    END as outcome
-                FROM session_groups
-                GROUP BY user_id, item_id, session_group_id
-                ORDER BY user_id, item_id, MIN(event_timestamp)
-            """
-            
             # Execute the session aggregation
-            self._cursor.execute(session_query)
-            rows_inserted = self._cursor.rowcount
-            self._connection.commit()
+            rows_inserted = self._insert_sessions(
+                "watch_hist_raw_events_data",
+                session_segment_minutes,
+                completed_ratio_threshold,
+                partial_ratio_threshold,
+                min_sampled_seconds,
+                engine,
+            )
+            
+            # every raw event is now sessionized, incremental refreshes continue from here
+            self._set_pipeline_state(
+                "sessions_last_raw_row_id",
+                self._cursor.execute("SELECT COALESCE(MAX(row_id), 0) FROM watch_hist_raw_events_data").fetchone()[0],
+            )
+            self._bump_data_version()
+            self._commit()
+            
+            # rebuild the indexes dropped above
+            if not self._INIT_create_user_watch_hist_schemas():
+                return False
             
             if self._debug:
                 print(f"[SQLiteConnector] Successfully created {rows_inserted} aggregated sessions!")
@@ -539,12 +1316,12 @@ class SQLiteConnector:
                 # Print some statistics
                 self._cursor.execute("""
                     SELECT 
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COUNT(DISTINCT item_id) as unique_items,
+                        COUNT(DISTINCT user_key) as unique_users,
+                        COUNT(DISTINCT item_key) as unique_items,
                         COUNT(*) as total_sessions,
                         AVG(session_span_minutes) as avg_session_minutes,
                         AVG(total_seconds_watched/60.0) as avg_watch_minutes
-                    FROM watch_hist_agg_sessions
+                    FROM watch_hist_agg_sessions_data
                 """)
                 stats = self._cursor.fetchone()
                 if stats:
@@ -557,7 +1334,7 @@ class SQLiteConnector:
                     # Show outcome distribution
                     self._cursor.execute("""
                         SELECT outcome, COUNT(*) as count
-                        FROM watch_hist_agg_sessions
+                        FROM watch_hist_agg_sessions_data
                         GROUP BY outcome
                         ORDER BY count DESC
                     """)
@@ -574,111 +1351,1036 @@ class SQLiteConnector:
 # -----------------------
 
 
-    def _INIT_POPULATE_watch_hist_user_item_stats(self) -> bool:
+    def _insert_sessions(
+        self,
+        events_source: str,
+        session_segment_minutes: int,
+        completed_ratio_threshold: float,
+        partial_ratio_threshold: float,
+        min_sampled_seconds: int,
+        engine: str = "sql",
+    ) -> int:
         """
-        **WARNING: THIS WILL FIRST DROP ALL DATA IN THE `watch_hist_user_item_stats` TABLE**
+        Sessionizes the raw events from `events_source` (`watch_hist_raw_events_data` rows) into 
+        `watch_hist_agg_sessions_data` with the selected engine. Does NOT commit.
         
-        Populates the user-item statistics table by aggregating data from watch_hist_agg_sessions.
+        Returns:
+            int: Number of sessions inserted
         """
+        if engine == "sql":
+            self._cursor.execute(self._build_session_insert_sql(
+                events_source, session_segment_minutes, completed_ratio_threshold, partial_ratio_threshold, min_sampled_seconds
+            ))
+            return self._cursor.rowcount
         
-        if self._connection is None:
-            if self._debug: print(f"[SQliteConnector] ERROR: Database connection not found!", file=sys.stderr)
-            return False
-        if self._cursor is None:
-            if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found!", file=sys.stderr)
-            return False
+        if engine != "pandas":
+            raise ValueError(f"Unknown sessionization engine '{engine}', expected 'sql' or 'pandas'")
         
-        try:
-            # clear out table
-            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_user_item_stats")
-            self._INIT_create_user_watch_hist_schemas()
-            
-            if self._debug:
-                print("[SQLiteConnector] Calculating user-item statistics from aggregated sessions")
-            
-            stats_query = """
-                INSERT INTO watch_hist_user_item_stats
-                (user_id, item_id, total_sessions, total_seconds_watched,
-                best_completion_ratio, average_completion_ratio,
-                rewatch_count, first_watched_timestamp, last_watched_timestamp,
-                adherence_score, completed_sessions, partial_sessions, 
-                abandoned_sessions, sampled_sessions)
-                SELECT 
-                    s.user_id,
-                    s.item_id,
-                    COUNT(*) as total_sessions,
-                    SUM(s.total_seconds_watched) as total_seconds,
-                    -- Use actual runtime from library_items when available
-                    CASE
-                        WHEN l.runtime_seconds > 0 THEN
-                            MIN(1.0, MAX(s.total_seconds_watched) / CAST(l.runtime_seconds AS REAL))
-                        WHEN l.item_type = 'Episode' THEN
-                            MIN(1.0, MAX(s.total_seconds_watched) / 1500.0)  -- Fallback 25 min
-                        WHEN l.item_type = 'Movie' THEN  
-                            MIN(1.0, MAX(s.total_seconds_watched) / 7200.0)  -- Fallback 2 hours
-                        ELSE 0
-                    END as best_completion,
-                    CASE
-                        WHEN l.runtime_seconds > 0 THEN
-                            MIN(1.0, AVG(s.total_seconds_watched) / CAST(l.runtime_seconds AS REAL))
-                        WHEN l.item_type = 'Episode' THEN
-                            MIN(1.0, AVG(s.total_seconds_watched) / 1500.0)
-                        WHEN l.item_type = 'Movie' THEN
-                            MIN(1.0, AVG(s.total_seconds_watched) / 7200.0)
-                        ELSE 0
-                    END as avg_completion,
-                    -- Rewatch count (sessions beyond the first)
-                    CASE 
-                        WHEN COUNT(*) > 1 THEN COUNT(*) - 1 
-                        ELSE 0 
-                    END as rewatches,
-                    MIN(s.session_start_timestamp) as first_watched,
-                    MAX(s.session_end_timestamp) as last_watched,
-                    -- Adherence score using actual runtime when available
-                    CASE
-                        WHEN l.runtime_seconds > 0 THEN
-                            (0.6 * MIN(1.0, MAX(s.total_seconds_watched) / CAST(l.runtime_seconds AS REAL)) +
-                            0.3 * MIN(1.0, COUNT(*) / 3.0) +
-                            0.1 * MIN(1.0, SUM(s.total_seconds_watched) / CAST(l.runtime_seconds AS REAL)))
-                        WHEN l.item_type = 'Episode' THEN
-                            (0.6 * MIN(1.0, MAX(s.total_seconds_watched) / 1500.0) +
-                            0.3 * MIN(1.0, COUNT(*) / 3.0) +
-                            0.1 * MIN(1.0, SUM(s.total_seconds_watched) / 3600.0))
-                        WHEN l.item_type = 'Movie' THEN
-                            (0.7 * MIN(1.0, MAX(s.total_seconds_watched) / 7200.0) +
-                            0.2 * MIN(1.0, COUNT(*) / 2.0) +
-                            0.1 * MIN(1.0, SUM(s.total_seconds_watched) / 7200.0))
-                        ELSE 0
-                    END as adherence,
-                    -- Session outcome counts
-                    SUM(CASE WHEN s.outcome = 'completed' THEN 1 ELSE 0 END) as completed,
-                    SUM(CASE WHEN s.outcome = 'partial' THEN 1 ELSE 0 END) as partial,
-                    SUM(CASE WHEN s.outcome = 'abandoned' THEN 1 ELSE 0 END) as abandoned,
-                    SUM(CASE WHEN s.outcome = 'sampled' THEN 1 ELSE 0 END) as sampled
-                FROM watch_hist_agg_sessions s
-                LEFT JOIN library_items l ON s.item_id = l.item_id
-                GROUP BY s.user_id, s.item_id
-            """
-            
-            self._cursor.execute(stats_query)
+        events = pd.read_sql_query(
+            f"""
+            SELECT e.user_key, e.item_key, i.item_type, e.event_epoch, e.duration, l.runtime_seconds
+            FROM {events_source} e
+            JOIN watch_hist_items i ON i.item_key = e.item_key
+            LEFT JOIN library_items l ON l.item_id = i.item_id
+            """,
+            self._connection,
+        )
+        sessions = self._sessionize_events_pandas(
+            events, session_segment_minutes, completed_ratio_threshold, partial_ratio_threshold, min_sampled_seconds
+        )
+        
+        # plain python values for sqlite3 (it can't bind numpy scalars)
+        rows = zip(*(sessions[c].astype(object).where(sessions[c].notna(), None).tolist() for c in sessions.columns))
+        self._cursor.executemany(
+            """INSERT INTO watch_hist_agg_sessions_data 
+            (user_key, item_key, session_start_epoch, session_end_epoch, session_span_minutes, 
+            total_seconds_watched, session_count, completion_ratio, outcome)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+        return len(sessions)
+# -----------------------
+
+
+    def _sessionize_events_pandas(
+        self,
+        events: pd.DataFrame,
+        session_segment_minutes: int,
+        completed_ratio_threshold: float,
+        partial_ratio_threshold: float,
+        min_sampled_seconds: int,
+    ) -> pd.DataFrame:
+        """
+        Vectorized equivalent of `_build_session_insert_sql`: gap-based session boundaries from a diff over sorted 
+        columnar arrays, then a segmented (reduceat) aggregation per session.
+        
+        Args:
+            events (pd.DataFrame): Columns user_key, item_key, item_type, event_epoch, duration, runtime_seconds
+        
+        Returns:
+            pd.DataFrame: One row per session, columns in `watch_hist_agg_sessions_data` insert order
+        """
+        columns = [
+            "user_key", "item_key", "session_start_epoch", "session_end_epoch", "session_span_minutes",
+            "total_seconds_watched", "session_count", "completion_ratio", "outcome",
+        ]
+        if events.empty:
+            return pd.DataFrame(columns=columns)
+        
+        # columnar arrays: epoch seconds + the integer user/item keys (no factorizing needed)
+        epoch = events["event_epoch"].to_numpy(dtype=np.int64)
+        user_codes = events["user_key"].to_numpy(dtype=np.int64)
+        item_codes = events["item_key"].to_numpy(dtype=np.int64)
+        duration = events["duration"].to_numpy(dtype=np.int64)
+        
+        order = np.lexsort((epoch, item_codes, user_codes))
+        epoch, user_codes, item_codes, duration = epoch[order], user_codes[order], item_codes[order], duration[order]
+        
+        # same julianday arithmetic SQLite uses (integer ms since -4713-11-24 12:00 / 86400000.0), so gaps sitting 
+        # exactly on the threshold split identically to the SQL engine
+        julian_day = (epoch * 1000 + 210866760000000) / 86400000.0
+        session_gap_days = session_segment_minutes / 1440.0
+        
+        new_pair = np.ones(len(epoch), dtype=bool)
+        new_pair[1:] = (user_codes[1:] != user_codes[:-1]) | (item_codes[1:] != item_codes[:-1])
+        new_session = new_pair.copy()
+        new_session[1:] |= (julian_day[1:] - julian_day[:-1]) > session_gap_days
+        
+        # events are sorted, so every session is a contiguous run: aggregate each run with ufunc.reduceat
+        # (a segmented groupby that stays in NumPy, no per-group python calls)
+        starts = np.flatnonzero(new_session)
+        ends = np.append(starts[1:], len(epoch)) - 1
+        # sorted factorize => code order matches string order, so MAX(item_type) is the max code
+        type_codes, item_types = pd.factorize(events["item_type"].to_numpy()[order], sort=True)
+        
+        total = np.add.reduceat(duration, starts).astype(np.float64)
+        runtime = np.fmax.reduceat(events["runtime_seconds"].to_numpy(dtype=np.float64)[order], starts)  # fmax skips NaN like SQL MAX skips NULL
+        item_type = np.asarray(item_types)[np.maximum.reduceat(type_codes, starts)]
+        has_runtime = runtime > 0     # NaN (no library row) compares False
+        is_episode = ~has_runtime & (item_type == "Episode")
+        is_movie = ~has_runtime & (item_type == "Movie")
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            completion_ratio = np.select(
+                [has_runtime, is_episode, is_movie],
+                [np.minimum(1.0, total / runtime), np.minimum(1.0, total / 1500.0), np.minimum(1.0, total / 7200.0)],
+                default=np.nan,
+            )
+            outcome = np.select(
+                [
+                    has_runtime & (total >= float(completed_ratio_threshold) * runtime),
+                    has_runtime & (total >= float(partial_ratio_threshold) * runtime),
+                    has_runtime & (total >= int(min_sampled_seconds)),
+                    has_runtime,
+                    is_episode & (total >= 1200), is_episode & (total >= 300), is_episode & (total >= 60), is_episode,
+                    is_movie & (total >= 5400), is_movie & (total >= 1800), is_movie & (total >= 300), is_movie,
+                ],
+                [
+                    "completed", "partial", "sampled", "abandoned",
+                    "completed", "partial", "sampled", "abandoned",
+                    "completed", "partial", "sampled", "abandoned",
+                ],
+                default="unknown",
+            )
+        
+        return pd.DataFrame({
+            "user_key": user_codes[starts],
+            "item_key": item_codes[starts],
+            "session_start_epoch": epoch[starts],
+            "session_end_epoch": epoch[ends],
+            "session_span_minutes": ((julian_day[ends] - julian_day[starts]) * 1440).astype(np.int64),
+            "total_seconds_watched": total.astype(np.int64),
+            "session_count": ends - starts + 1,
+            "completion_ratio": completion_ratio,
+            "outcome": outcome,
+        }, columns=columns)
+# -----------------------
+
+
+    def _build_session_insert_sql(
+        self,
+        events_source: str,
+        session_segment_minutes: int,
+        completed_ratio_threshold: float,
+        partial_ratio_threshold: float,
+        min_sampled_seconds: int,
+    ) -> str:
+        """
+        Builds the INSERT ... SELECT that sessionizes raw events into `watch_hist_agg_sessions`.
+        
+        Args:
+            events_source (str): Table name or parenthesised subquery yielding `watch_hist_raw_events_data` rows to sessionize
+        """
+        # convert session segment to fraction of a day for Julian day calculations: https://sqlite.org/lang_datefunc.html
+        session_gap_days = session_segment_minutes / 1440.0  # 1440 minutes in a day
+        completed_t = float(completed_ratio_threshold)
+        partial_t = float(partial_ratio_threshold)
+        min_sample = int(min_sampled_seconds)
+        
+        # below query seems complex but here's a breakdown:
+        # 1. ordered_events: Selects the raw events with their epoch timestamp, and joins each item's runtime ONCE
+        # 2. session_boundaries: Uses a single LAG window to find the previous event in the same user/item partition
+        # 3. session_groups: Assigns a session group ID to each event by cumulatively summing new session markers (gap > threshold)
+        # 4. sessions: Aggregates events by session group (start/end, total watch time, event count, runtime)
+        # 5. Final SELECT: Derives span, completion ratio and outcome from the aggregated columns in the same pass
+        return f"""
+            INSERT INTO watch_hist_agg_sessions_data 
+            (user_key, item_key, session_start_epoch, 
+            session_end_epoch, session_span_minutes, total_seconds_watched, 
+            session_count, completion_ratio, outcome)
+            WITH ordered_events AS (
+                -- First, get all events with their epoch timestamp and their item's type and runtime
+                SELECT 
+                    e.user_key,
+                    e.item_key,
+                    i.item_type,
+                    e.event_epoch,
+                    e.duration,
+                    l.runtime_seconds
+                FROM {events_source} e
+                JOIN watch_hist_items i ON i.item_key = e.item_key
+                LEFT JOIN library_items l ON l.item_id = i.item_id
+            ),
+            session_boundaries AS (
+                -- Identify session boundaries using LAG window function
+                SELECT 
+                    *,
+                    LAG(event_epoch) OVER (
+                        PARTITION BY user_key, item_key 
+                        ORDER BY event_epoch
+                    ) as prev_event_epoch
+                FROM ordered_events
+            ),
+            session_groups AS (
+                -- Assign session IDs using cumulative sum of new session markers
+                SELECT 
+                    *,
+                    SUM(
+                        CASE 
+                            WHEN prev_event_epoch IS NULL THEN 1  -- First event is always new session
+                            WHEN julianday(event_epoch, 'unixepoch') - julianday(prev_event_epoch, 'unixepoch') > {session_gap_days} THEN 1  -- Gap > threshold means new session
+                            ELSE 0
+                        END
+                    ) OVER (
+                        PARTITION BY user_key, item_key 
+                        ORDER BY event_epoch
+                        ROWS UNBOUNDED PRECEDING
+                    ) as session_group_id
+                FROM session_boundaries
+            ),
+            sessions AS (
+                -- Aggregation by session
+                SELECT 
+                    user_key,
+                    item_key,
+                    MIN(event_epoch) as session_start_epoch,
+                    MAX(event_epoch) as session_end_epoch,
+                    SUM(duration) as total_seconds_watched,
+                    COUNT(*) as session_count,
+                    MAX(item_type) as item_type,
+                    MAX(runtime_seconds) as runtime_seconds
+                FROM session_groups
+                GROUP BY user_key, item_key, session_group_id
+            )
+            SELECT 
+                user_key,
+                item_key,
+                session_start_epoch,
+                session_end_epoch,
+                CAST(
+                    (julianday(session_end_epoch, 'unixepoch') - julianday(session_start_epoch, 'unixepoch')) * 1440 
+                    AS INTEGER
+                ) as session_span_minutes,
+                total_seconds_watched,
+                session_count,
+                -- Compute completion ratio using actual runtime when available
+                CASE 
+                    WHEN runtime_seconds > 0 THEN 
+                        MIN(1.0, total_seconds_watched / CAST(runtime_seconds AS REAL))
+                    WHEN item_type = 'Episode' THEN 
+                        MIN(1.0, total_seconds_watched / 1500.0)  -- Fallback 25 min
+                    WHEN item_type = 'Movie' THEN   
+                        MIN(1.0, total_seconds_watched / 7200.0)  -- Fallback 2 hours
+                    ELSE NULL
+                END as completion_ratio,
+                -- Determine outcome using actual runtime when available
+                CASE 
+                    WHEN runtime_seconds > 0 THEN 
+                        CASE
+                            WHEN total_seconds_watched >= {completed_t} * runtime_seconds THEN 'completed'
+                            WHEN total_seconds_watched >= {partial_t} * runtime_seconds THEN 'partial'
+                            WHEN total_seconds_watched >= {min_sample} THEN 'sampled'
+                            ELSE 'abandoned'
+                        END
+                    WHEN item_type = 'Episode' THEN
+                        CASE
+                            WHEN total_seconds_watched >= 1200 THEN 'completed'  -- 20+ min for episodes
+                            WHEN total_seconds_watched >= 300 THEN 'partial'     -- 5-20 min
+                            WHEN total_seconds_watched >= 60 THEN 'sampled'      -- 1-5 min
+                            ELSE 'abandoned'                              -- <1 min
+                        END
+                    WHEN item_type = 'Movie' THEN
+                        CASE
+                            WHEN total_seconds_watched >= 5400 THEN 'completed'  -- 90+ min for movies
+                            WHEN total_seconds_watched >= 1800 THEN 'partial'    -- 30-90 min
+                            WHEN total_seconds_watched >= 300 THEN 'sampled'     -- 5-30 min
+                            ELSE 'abandoned'                              -- <5 min
+                        END
+                    ELSE 'unknown'
+                END as outcome
+            FROM sessions
+            ORDER BY user_key, item_key, session_start_epoch
+        """
+# -----------------------
+
+
+    def refresh_watch_hist_agg_sessions(
+        self,
+        session_segment_minutes: int = 15,
+        completed_ratio_threshold: float = 0.9,
+        partial_ratio_threshold: float = 0.25,
+        min_sampled_seconds: int = 60,
+        engine: str = "sql",
+    ) -> bool:
+        """
+        Incrementally updates `watch_hist_agg_sessions` with raw events added since the last sessionization.
+        
+        Only the (user, item) pairs touched by new events are recomputed, and only from their first session that 
+        could be affected (a trailing session ending within `session_segment_minutes` of the earliest new event is 
+        re-opened and merged). All other sessions are left untouched. Falls back to the full 
+        `_INIT_POPULATE_watch_hist_agg_sessions` if sessions have never been built.
+        
+        NOTE: use the same parameters as the full build, otherwise re-opened sessions will be segmented differently.
+        """
+        
+        if self._connection is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database connection not found!", file=sys.stderr)
+            return False
+        if self._cursor is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found!", file=sys.stderr)
+            return False
+        
+        if not self._INIT_create_user_watch_hist_schemas():
+            return False
+        
+        last_row_id = self._get_pipeline_state("sessions_last_raw_row_id")
+        if last_row_id is None:
+            if self._debug: print("[SQLiteConnector] No sessionization watermark found, running full session build")
+            return self._INIT_POPULATE_watch_hist_agg_sessions(
+                session_segment_minutes, completed_ratio_threshold, partial_ratio_threshold, min_sampled_seconds, engine
+            )
+        
+        try:
+            self._cursor.execute("BEGIN")
+            
+            # pairs with new events, and the earliest new event for each
+            self._cursor.execute("DROP TABLE IF EXISTS temp.touched_session_pairs")
+            self._cursor.execute("""
+                CREATE TEMP TABLE touched_session_pairs AS
+                SELECT 
+                    user_key,
+                    item_key,
+                    MIN(event_epoch) AS min_new_epoch,
+                    NULL AS rebuild_from_epoch
+                FROM watch_hist_raw_events_data
+                WHERE row_id > ?
+                GROUP BY user_key, item_key
+            """, (int(last_row_id),))
+            self._cursor.execute("CREATE UNIQUE INDEX temp.idx_touched_session_pairs ON touched_session_pairs(user_key, item_key)")
+            
+            # rebuild from the earliest session the new events could merge into (or the new events themselves)
+            self._cursor.execute(f"""
+                UPDATE touched_session_pairs
+                SET rebuild_from_epoch = MIN(
+                    min_new_epoch,
+                    COALESCE((
+                        SELECT MIN(s.session_start_epoch)
+                        FROM watch_hist_agg_sessions_data s
+                        WHERE s.user_key = touched_session_pairs.user_key
+                        AND s.item_key = touched_session_pairs.item_key
+                        AND s.session_end_epoch >= min_new_epoch - {int(session_segment_minutes) * 60}
+                    ), min_new_epoch)
+                )
+            """)
+            
+            self._cursor.execute("""
+                DELETE FROM watch_hist_agg_sessions_data
+                WHERE EXISTS (
+                    SELECT 1 FROM touched_session_pairs t
+                    WHERE t.user_key = watch_hist_agg_sessions_data.user_key
+                    AND t.item_key = watch_hist_agg_sessions_data.item_key
+                    AND watch_hist_agg_sessions_data.session_start_epoch >= t.rebuild_from_epoch
+                )
+            """)
+            sessions_removed = self._cursor.rowcount
+            
+            sessions_inserted = self._insert_sessions(
+                """(
+                    SELECT e.*
+                    FROM watch_hist_raw_events_data e
+                    JOIN touched_session_pairs t ON t.user_key = e.user_key AND t.item_key = e.item_key
+                    WHERE e.event_epoch >= t.rebuild_from_epoch
+                )""",
+                session_segment_minutes,
+                completed_ratio_threshold,
+                partial_ratio_threshold,
+                min_sampled_seconds,
+                engine,
+            )
+            
+            pairs_touched = self._cursor.execute("SELECT COUNT(*) FROM touched_session_pairs").fetchone()[0]
+            self._set_pipeline_state(
+                "sessions_last_raw_row_id",
+                self._cursor.execute("SELECT COALESCE(MAX(row_id), 0) FROM watch_hist_raw_events_data").fetchone()[0],
+            )
+            if pairs_touched:
+                self._bump_data_version()
+            self._commit()
+            self._cursor.execute("DROP TABLE IF EXISTS temp.touched_session_pairs")
+            
+            if self._debug:
+                print(f"[SQLiteConnector] Incremental sessionization: {pairs_touched} user/item pairs touched, {sessions_removed} sessions replaced by {sessions_inserted}")
+        
+        except sqlite3.Error as e:
+            if self._debug: print(f"[SQLiteConnector] ERROR: When incrementally refreshing watch sessions: {e}", file=sys.stderr)
+            self._connection.rollback()
+            return False
+        
+        return True
+# -----------------------
+
+
+    def _INIT_POPULATE_watch_hist_user_item_stats(self) -> bool:
+        """
+        **WARNING: THIS WILL FIRST DROP ALL DATA IN THE `watch_hist_user_item_stats` TABLE**
+        
+        Populates the user-item statistics table by aggregating data from watch_hist_agg_sessions.
+        """
+        
+        if self._connection is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database connection not found!", file=sys.stderr)
+            return False
+        if self._cursor is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found!", file=sys.stderr)
+            return False
+        
+        try:
+            # clear out table
+            self._INIT_create_user_watch_hist_schemas()     # migrates old TEXT-keyed tables first
+            self._cursor.execute("DROP TABLE IF EXISTS watch_hist_user_item_stats_data")
+            self._INIT_create_user_watch_hist_schemas()
+            
+            if self._debug:
+                print("[SQLiteConnector] Calculating user-item statistics from aggregated sessions")
+            
+            stats_query = self._build_user_item_stats_insert_sql()
+            
+            self._cursor.execute(stats_query)
+            rows_inserted = self._cursor.rowcount
+            self._bump_data_version()
+            self._commit()
+            
+            if self._debug:
+                print(f"[SQLiteConnector] Successfully created stats for {rows_inserted} user-item pairs")
+            
+        except sqlite3.Error as e:
+            if self._debug:
+                print(f"[SQLiteConnector] ERROR creating user-item stats: {e}", file=sys.stderr)
+            self._connection.rollback()
+            return False
+        
+        return True
+# -------------------------------------------
+
+    def _build_user_item_stats_insert_sql(self, where_clause: str = "true", upsert: bool = False) -> str:
+        """
+        Builds the INSERT ... SELECT that aggregates `watch_hist_agg_sessions_data` into `watch_hist_user_item_stats_data`.
+        
+        Args:
+            where_clause (str): Filter applied to the sessions (aliased `s`) before grouping
+            upsert (bool): Overwrite existing (user_key, item_key) rows instead of failing on the unique constraint
+        """
+        upsert_clause = ""
+        if upsert:
+            upsert_clause = """
+                ON CONFLICT(user_key, item_key) DO UPDATE SET
+                    total_sessions = excluded.total_sessions,
+                    total_seconds_watched = excluded.total_seconds_watched,
+                    best_completion_ratio = excluded.best_completion_ratio,
+                    average_completion_ratio = excluded.average_completion_ratio,
+                    rewatch_count = excluded.rewatch_count,
+                    first_watched_epoch = excluded.first_watched_epoch,
+                    last_watched_epoch = excluded.last_watched_epoch,
+                    adherence_score = excluded.adherence_score,
+                    completed_sessions = excluded.completed_sessions,
+                    partial_sessions = excluded.partial_sessions,
+                    abandoned_sessions = excluded.abandoned_sessions,
+                    sampled_sessions = excluded.sampled_sessions,
+                    last_updated_epoch = excluded.last_updated_epoch
+            """
+        
+        return f"""
+            INSERT INTO watch_hist_user_item_stats_data
+            (user_key, item_key, total_sessions, total_seconds_watched,
+            best_completion_ratio, average_completion_ratio,
+            rewatch_count, first_watched_epoch, last_watched_epoch,
+            adherence_score, completed_sessions, partial_sessions, 
+            abandoned_sessions, sampled_sessions, last_updated_epoch)
+            SELECT 
+                s.user_key,
+                s.item_key,
+                COUNT(*) as total_sessions,
+                SUM(s.total_seconds_watched) as total_seconds,
+                -- Use actual runtime from library_items when available
+                CASE
+                    WHEN l.runtime_seconds > 0 THEN
+                        MIN(1.0, MAX(s.total_seconds_watched) / CAST(l.runtime_seconds AS REAL))
+                    WHEN l.item_type = 'Episode' THEN
+                        MIN(1.0, MAX(s.total_seconds_watched) / 1500.0)  -- Fallback 25 min
+                    WHEN l.item_type = 'Movie' THEN  
+                        MIN(1.0, MAX(s.total_seconds_watched) / 7200.0)  -- Fallback 2 hours
+                    ELSE 0
+                END as best_completion,
+                CASE
+                    WHEN l.runtime_seconds > 0 THEN
+                        MIN(1.0, AVG(s.total_seconds_watched) / CAST(l.runtime_seconds AS REAL))
+                    WHEN l.item_type = 'Episode' THEN
+                        MIN(1.0, AVG(s.total_seconds_watched) / 1500.0)
+                    WHEN l.item_type = 'Movie' THEN
+                        MIN(1.0, AVG(s.total_seconds_watched) / 7200.0)
+                    ELSE 0
+                END as avg_completion,
+                -- Rewatch count (sessions beyond the first)
+                CASE 
+                    WHEN COUNT(*) > 1 THEN COUNT(*) - 1 
+                    ELSE 0 
+                END as rewatches,
+                MIN(s.session_start_epoch) as first_watched,
+                MAX(s.session_end_epoch) as last_watched,
+                -- Adherence score using actual runtime when available
+                CASE
+                    WHEN l.runtime_seconds > 0 THEN
+                        (0.6 * MIN(1.0, MAX(s.total_seconds_watched) / CAST(l.runtime_seconds AS REAL)) +
+                        0.3 * MIN(1.0, COUNT(*) / 3.0) +
+                        0.1 * MIN(1.0, SUM(s.total_seconds_watched) / CAST(l.runtime_seconds AS REAL)))
+                    WHEN l.item_type = 'Episode' THEN
+                        (0.6 * MIN(1.0, MAX(s.total_seconds_watched) / 1500.0) +
+                        0.3 * MIN(1.0, COUNT(*) / 3.0) +
+                        0.1 * MIN(1.0, SUM(s.total_seconds_watched) / 3600.0))
+                    WHEN l.item_type = 'Movie' THEN
+                        (0.7 * MIN(1.0, MAX(s.total_seconds_watched) / 7200.0) +
+                        0.2 * MIN(1.0, COUNT(*) / 2.0) +
+                        0.1 * MIN(1.0, SUM(s.total_seconds_watched) / 7200.0))
+                    ELSE 0
+                END as adherence,
+                -- Session outcome counts
+                SUM(CASE WHEN s.outcome = 'completed' THEN 1 ELSE 0 END) as completed,
+                SUM(CASE WHEN s.outcome = 'partial' THEN 1 ELSE 0 END) as partial,
+                SUM(CASE WHEN s.outcome = 'abandoned' THEN 1 ELSE 0 END) as abandoned,
+                SUM(CASE WHEN s.outcome = 'sampled' THEN 1 ELSE 0 END) as sampled,
+                CAST(strftime('%s', 'now') AS INTEGER) as last_updated
+            FROM watch_hist_agg_sessions_data s
+            JOIN watch_hist_items i ON i.item_key = s.item_key
+            LEFT JOIN library_items l ON l.item_id = i.item_id
+            WHERE {where_clause}
+            GROUP BY s.user_key, s.item_key
+            {upsert_clause}
+        """
+# -------------------------------------------
+
+
+    def refresh_watch_hist_user_item_stats(self) -> bool:
+        """
+        Incrementally upserts `watch_hist_user_item_stats` for user/item pairs whose sessions changed since the stats 
+        were last updated (sessions created at or after the latest `last_updated_epoch`). Unchanged pairs are left as is.
+        
+        Falls back to the full `_INIT_POPULATE_watch_hist_user_item_stats` if the stats table is empty.
+        """
+        
+        if self._connection is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database connection not found!", file=sys.stderr)
+            return False
+        if self._cursor is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found!", file=sys.stderr)
+            return False
+        
+        if not self._INIT_create_user_watch_hist_schemas():
+            return False
+        
+        last_updated = self._cursor.execute("SELECT MAX(last_updated_epoch) FROM watch_hist_user_item_stats_data").fetchone()[0]
+        if last_updated is None:
+            if self._debug: print("[SQLiteConnector] No existing user-item stats, running full stats build")
+            return self._INIT_POPULATE_watch_hist_user_item_stats()
+        
+        try:
+            self._cursor.execute("BEGIN")
+            
+            # pairs with sessions (re)created since the last stats update
+            self._cursor.execute("DROP TABLE IF EXISTS temp.changed_stat_pairs")
+            self._cursor.execute("""
+                CREATE TEMP TABLE changed_stat_pairs AS
+                SELECT DISTINCT user_key, item_key
+                FROM watch_hist_agg_sessions_data
+                WHERE created_epoch >= ?
+            """, (last_updated,))
+            self._cursor.execute("CREATE UNIQUE INDEX temp.idx_changed_stat_pairs ON changed_stat_pairs(user_key, item_key)")
+            
+            self._cursor.execute(self._build_user_item_stats_insert_sql(
+                "EXISTS (SELECT 1 FROM changed_stat_pairs c WHERE c.user_key = s.user_key AND c.item_key = s.item_key)",
+                upsert=True,
+            ))
+            rows_upserted = self._cursor.rowcount
+            if rows_upserted:
+                self._bump_data_version()
+            
+            self._commit()
+            self._cursor.execute("DROP TABLE IF EXISTS temp.changed_stat_pairs")
+            
+            if self._debug:
+                print(f"[SQLiteConnector] Refreshed stats for {rows_upserted} changed user-item pairs")
+        
+        except sqlite3.Error as e:
+            if self._debug: print(f"[SQLiteConnector] ERROR refreshing user-item stats: {e}", file=sys.stderr)
+            self._connection.rollback()
+            return False
+        
+        return True
+# -------------------------------------------
+
+    def update_completion_ratios(self):
+        """
+        Update completion ratios in sessions table using actual runtime data
+        
+        NOTE: no longer part of the pipeline - sessions are now written with runtime-aware completion ratios in a 
+        single pass (see `_build_session_insert_sql`). Kept for databases whose sessions were built before that.
+        """
+        if self._connection is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database connection not found!", file=sys.stderr)
+            return False
+        if self._cursor is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found!", file=sys.stderr)
+            return False
+        
+        # SQLite-compatible correlated subquery (no UPDATE ... FROM support)
+        self._cursor.execute(
+            """
+            UPDATE watch_hist_agg_sessions_data
+            SET completion_ratio = MIN(
+                1.0,
+                CAST(total_seconds_watched AS REAL) / (
+                    SELECT l.runtime_seconds 
+                    FROM watch_hist_items i
+                    JOIN library_items l ON l.item_id = i.item_id
+                    WHERE i.item_key = watch_hist_agg_sessions_data.item_key
+                )
+            )
+            WHERE EXISTS (
+                SELECT 1 FROM watch_hist_items i
+                JOIN library_items l ON l.item_id = i.item_id
+                WHERE i.item_key = watch_hist_agg_sessions_data.item_key
+                AND l.runtime_seconds > 0
+            )
+            """
+        )
+        if self._cursor.rowcount:
+            self._bump_data_version()
+        
+        self._commit()
+        
+        if self._debug:
+            print("[SQLiteConnector] Updated completion ratios with actual runtime data")
+# -------------------------------------------
+
+
+    # ====================================================================== User Profile Rollups ======================================================================
+
+    def _INIT_create_user_affinity_schemas(self) -> bool:
+        """
+        Creates (if doesn't exist) the per-user genre/tag affinity rollups, one row per user and genre (or tag). The 
+        rows are clustered on (user_key, name) (WITHOUT ROWID), so a user's whole profile is one primary key range read.
+        
+        NOTE: Requires the watch history and `library_items` tables to exist. DB connection **must be active**.
+        
+        ---
+        Tables:
+        
+        `user_genre_affinity` (from `item_genres`) - `user_tag_affinity` (from `item_tags`)
+        """
+        if self._connection is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database connection not found when attempting to create schema!", file=sys.stderr)
+            return False
+        if self._cursor is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found when attempting to create schema!", file=sys.stderr)
+            return False
+        
+        try:
+            for table, (_, id_column, name_column) in self.AFFINITY_ROLLUPS.items():
+                self._cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        user_key INTEGER NOT NULL REFERENCES watch_hist_users(user_key),
+                        {name_column} TEXT NOT NULL,
+                        {id_column} INTEGER,
+                        affinity_score REAL NOT NULL,           -- sum of adherence_score x recency weight of the user's items with this label
+                        affinity_share REAL NOT NULL,           -- affinity_score / the user's total over all labels (sums to 1 per user)
+                        item_count INTEGER NOT NULL,
+                        total_seconds_watched INTEGER NOT NULL,
+                        last_watched_epoch INTEGER,
+                        PRIMARY KEY (user_key, {name_column})
+                    ) WITHOUT ROWID
+                """)
+            self._connection.commit()
+        except sqlite3.Error as e:
+            if self._debug: print(f"[SQLiteConnector] ERROR: Failed to create user affinity schemas: {e}", file=sys.stderr)
+            self._connection.rollback()
+            return False
+        
+        return True
+# -------------------------------------------
+
+
+    def _build_user_affinity_insert_sql(self, table: str, where_clause: str = "true") -> str:
+        """
+        Builds the INSERT ... SELECT that rolls `watch_hist_user_item_stats_data` up into an AFFINITY_ROLLUPS table.
+        
+        Each watched item adds `adherence_score / (1 + age / AFFINITY_RECENCY_HALF_LIFE_DAYS)` to every label it carries, 
+        with age measured back from the user's own latest watch, so a user's weights only change when they watch 
+        something (not as the clock moves). Series themselves aren't ingested, so items without labels of their own 
+        (typically episodes) use the labels of the other episodes sharing their `series_id`.
+        
+        Args:
+            table (str): AFFINITY_ROLLUPS key
+            where_clause (str): Filter applied to the stats (aliased `st`), must select whole users
+        """
+        label_table, id_column, name_column = self.AFFINITY_ROLLUPS[table]
+        half_life_seconds = 86400.0 * self.AFFINITY_RECENCY_HALF_LIFE_DAYS
+        return f"""
+            INSERT INTO {table} (
+                user_key, {name_column}, {id_column}, affinity_score, affinity_share, 
+                item_count, total_seconds_watched, last_watched_epoch
+            )
+            WITH weighted AS (
+                SELECT 
+                    st.user_key, st.item_key, st.total_seconds_watched, st.last_watched_epoch,
+                    st.adherence_score / (
+                        1.0 + (MAX(st.last_watched_epoch) OVER (PARTITION BY st.user_key) - st.last_watched_epoch) / {half_life_seconds}
+                    ) AS weight
+                FROM watch_hist_user_item_stats_data st
+                WHERE {where_clause}
+            ),
+            item_labels AS (
+                -- the item's own labels
+                SELECT w.user_key, w.item_key, t.{name_column} AS label_name, t.{id_column} AS label_id
+                FROM weighted w
+                JOIN watch_hist_items i ON i.item_key = w.item_key
+                JOIN {label_table} t ON t.item_id = i.item_id
+                UNION ALL
+                -- items without labels of their own: labels of the sibling episodes in the same series
+                SELECT w.user_key, w.item_key, t.{name_column}, t.{id_column}
+                FROM weighted w
+                JOIN watch_hist_items i ON i.item_key = w.item_key
+                JOIN library_items l ON l.item_id = i.item_id
+                JOIN library_items sib ON sib.series_id = l.series_id
+                JOIN {label_table} t ON t.item_id = sib.item_id
+                WHERE l.series_id IS NOT NULL 
+                AND NOT EXISTS (SELECT 1 FROM {label_table} own WHERE own.item_id = l.item_id)
+            ),
+            labelled AS (
+                -- one row per user, item and label
+                SELECT 
+                    w.user_key, w.item_key, w.weight, w.total_seconds_watched, w.last_watched_epoch,
+                    il.label_name, MIN(il.label_id) AS label_id
+                FROM item_labels il
+                JOIN weighted w ON w.user_key = il.user_key AND w.item_key = il.item_key
+                WHERE COALESCE(il.label_name, '') <> ''
+                GROUP BY il.user_key, il.item_key, il.label_name
+            )
+            SELECT 
+                user_key, label_name, MIN(label_id),
+                SUM(weight) AS affinity_score,
+                COALESCE(SUM(weight) / NULLIF(SUM(SUM(weight)) OVER (PARTITION BY user_key), 0), 0) AS affinity_share,
+                COUNT(*) AS item_count,
+                SUM(total_seconds_watched),
+                MAX(last_watched_epoch)
+            FROM labelled
+            GROUP BY user_key, label_name
+        """
+# -------------------------------------------
+
+
+    def _INIT_POPULATE_user_affinity(self) -> bool:
+        """
+        **WARNING: THIS WILL FIRST DELETE ALL DATA IN THE `user_genre_affinity` AND `user_tag_affinity` TABLES**
+        
+        Builds the per-user genre and tag affinity rollups from `watch_hist_user_item_stats` and the library labels, in 
+        one transaction. Run after the user-item stats are built.
+        """
+        if self._connection is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database connection not found!", file=sys.stderr)
+            return False
+        if self._cursor is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found!", file=sys.stderr)
+            return False
+        
+        if not self._INIT_create_user_watch_hist_schemas() or not self._INIT_create_user_affinity_schemas():
+            return False
+        
+        try:
+            self._cursor.execute("BEGIN")
+            refreshed_epoch = self._cursor.execute("SELECT CAST(strftime('%s', 'now') AS INTEGER)").fetchone()[0]
+            rows_inserted = {}
+            for table in self.AFFINITY_ROLLUPS:
+                self._cursor.execute(f"DELETE FROM {table}")
+                self._cursor.execute(self._build_user_affinity_insert_sql(table))
+                rows_inserted[table] = self._cursor.rowcount
+            
+            # stats updated (or library items changed) from here on are picked up by refresh_user_affinity()
+            self._set_pipeline_state("affinity_last_refresh_epoch", refreshed_epoch)
+            self._bump_data_version()
+            self._commit()
+            
+            if self._debug:
+                print(f"[SQLiteConnector] Built user affinity rollups: {rows_inserted}")
+        
+        except sqlite3.Error as e:
+            if self._debug: print(f"[SQLiteConnector] ERROR building user affinity rollups: {e}", file=sys.stderr)
+            self._connection.rollback()
+            return False
+        
+        return True
+# -------------------------------------------
+
+
+    def refresh_user_affinity(self) -> bool:
+        """
+        Incrementally rebuilds the genre/tag affinity rows of users whose profile may have changed since the last build: 
+        users with user-item stats updated since then, and users who watched a library item re-ingested since then (or 
+        another episode of its series, whose labels may be borrowed). Every other user's rows are left as is.
+        
+        Falls back to the full `_INIT_POPULATE_user_affinity` if the rollups have never been built, or if library items 
+        were pruned since (a pruned item can no longer be traced back to its viewers or series).
+        """
+        if self._connection is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database connection not found!", file=sys.stderr)
+            return False
+        if self._cursor is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found!", file=sys.stderr)
+            return False
+        
+        if not self._INIT_create_user_watch_hist_schemas() or not self._INIT_create_user_affinity_schemas():
+            return False
+        
+        last_refresh = self._get_pipeline_state("affinity_last_refresh_epoch")
+        last_prune = self._get_pipeline_state("library_last_prune_epoch")
+        if last_refresh is None or (last_prune is not None and int(last_prune) >= int(last_refresh)):
+            if self._debug: print("[SQLiteConnector] User affinity never built or library pruned since, running full build")
+            return self._INIT_POPULATE_user_affinity()
+        last_refresh = int(last_refresh)
+        
+        try:
+            self._cursor.execute("BEGIN")
+            refreshed_epoch = self._cursor.execute("SELECT CAST(strftime('%s', 'now') AS INTEGER)").fetchone()[0]
+            
+            self._cursor.execute("DROP TABLE IF EXISTS temp.touched_affinity_users")
+            self._cursor.execute("CREATE TEMP TABLE touched_affinity_users (user_key INTEGER PRIMARY KEY)")
+            self._cursor.execute("""
+                INSERT OR IGNORE INTO touched_affinity_users
+                SELECT user_key FROM watch_hist_user_item_stats_data WHERE last_updated_epoch >= ?
+            """, (last_refresh,))
+            # library_items.last_updated (UTC text) is reset whenever an item is re-ingested with changes
+            self._cursor.execute("""
+                INSERT OR IGNORE INTO touched_affinity_users
+                SELECT st.user_key
+                FROM watch_hist_user_item_stats_data st
+                JOIN watch_hist_items i ON i.item_key = st.item_key
+                JOIN library_items l ON l.item_id = i.item_id
+                WHERE l.last_updated >= datetime(?1, 'unixepoch')
+                OR l.series_id IN (
+                    SELECT series_id FROM library_items 
+                    WHERE last_updated >= datetime(?1, 'unixepoch') AND series_id IS NOT NULL
+                )
+            """, (last_refresh,))
+            
+            users_touched = self._cursor.execute("SELECT COUNT(*) FROM touched_affinity_users").fetchone()[0]
+            if users_touched:
+                for table in self.AFFINITY_ROLLUPS:
+                    self._cursor.execute(f"DELETE FROM {table} WHERE user_key IN (SELECT user_key FROM touched_affinity_users)")
+                    self._cursor.execute(self._build_user_affinity_insert_sql(
+                        table, "st.user_key IN (SELECT user_key FROM touched_affinity_users)"
+                    ))
+                self._bump_data_version()
+            
+            self._set_pipeline_state("affinity_last_refresh_epoch", refreshed_epoch)
+            self._commit()
+            self._cursor.execute("DROP TABLE IF EXISTS temp.touched_affinity_users")
+            
+            if self._debug:
+                print(f"[SQLiteConnector] Refreshed user affinity for {users_touched} users")
+        
+        except sqlite3.Error as e:
+            if self._debug: print(f"[SQLiteConnector] ERROR refreshing user affinity: {e}", file=sys.stderr)
+            self._connection.rollback()
+            return False
+        
+        return True
+# -------------------------------------------
+
+
+    def _INIT_create_user_series_stats_schema(self) -> bool:
+        """
+        Creates (if doesn't exist) `watch_hist_user_series_stats`: one row per user and series, rolled up from the 
+        episode sessions. Clustered on (user_key, series_id) (WITHOUT ROWID), so a user's shows are one primary key range read.
+        
+        NOTE: Requires the watch history and `library_items` tables to exist. DB connection **must be active**.
+        """
+        if self._connection is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database connection not found when attempting to create schema!", file=sys.stderr)
+            return False
+        if self._cursor is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found when attempting to create schema!", file=sys.stderr)
+            return False
+        
+        SCHEMA_watch_hist_user_series_stats = """
+            CREATE TABLE IF NOT EXISTS watch_hist_user_series_stats (
+                user_key INTEGER NOT NULL REFERENCES watch_hist_users(user_key),
+                series_id TEXT NOT NULL,
+                series_name TEXT,
+                episodes_watched INTEGER NOT NULL,          -- distinct episodes with at least one session
+                episodes_completed INTEGER NOT NULL,        -- distinct episodes with a 'completed' session
+                episodes_available INTEGER,                 -- episodes of the series in library_items
+                watched_ratio REAL GENERATED ALWAYS AS (
+                    CASE WHEN episodes_available > 0 THEN MIN(1.0, episodes_watched * 1.0 / episodes_available) END
+                ),
+                total_sessions INTEGER NOT NULL,
+                total_seconds_watched INTEGER NOT NULL,
+                active_days INTEGER NOT NULL,               -- distinct (local) days the user finished a session of the series
+                binge_velocity REAL GENERATED ALWAYS AS (episodes_watched * 1.0 / active_days),    -- episodes per active day
+                dropoff_season_number INTEGER,              -- furthest episode reached, in season/episode order
+                dropoff_episode_number INTEGER,
+                caught_up INTEGER NOT NULL,                 -- 1 once the furthest episode reached is the last one available
+                first_watched_epoch INTEGER,
+                last_watched_epoch INTEGER,
+                last_updated_epoch INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),    -- UTC
+                PRIMARY KEY (user_key, series_id)
+            ) WITHOUT ROWID
+        """
+        try:
+            self._cursor.execute(SCHEMA_watch_hist_user_series_stats)
+            self._connection.commit()
+        except sqlite3.Error as e:
+            if self._debug: print(f"[SQLiteConnector] ERROR: Failed to create user series stats schema: {e}", file=sys.stderr)
+            self._connection.rollback()
+            return False
+        
+        return True
+# -------------------------------------------
+
+
+    def _build_user_series_stats_insert_sql(self, where_clause: str = "true") -> str:
+        """
+        Builds the INSERT ... SELECT that rolls episode sessions up into `watch_hist_user_series_stats` in one pass over 
+        `watch_hist_agg_sessions_data` (episodes are mapped to their series through `library_items.series_id`).
+        
+        Args:
+            where_clause (str): Filter applied to the sessions (aliased `s`) and their library rows (aliased `l`), 
+                must select whole (user, series) pairs
+        """
+        # season/episode packed into one sortable number, so the furthest episode is a plain MAX()
+        episode_order = "(COALESCE(l.season_number, 0) * 100000 + COALESCE(l.episode_number, 0))"
+        return f"""
+            INSERT INTO watch_hist_user_series_stats (
+                user_key, series_id, series_name, episodes_watched, episodes_completed, episodes_available,
+                total_sessions, total_seconds_watched, active_days, dropoff_season_number, dropoff_episode_number,
+                caught_up, first_watched_epoch, last_watched_epoch, last_updated_epoch
+            )
+            WITH per_series AS (
+                SELECT 
+                    s.user_key,
+                    l.series_id,
+                    COUNT(DISTINCT s.item_key) AS episodes_watched,
+                    COUNT(DISTINCT CASE WHEN s.outcome = 'completed' THEN s.item_key END) AS episodes_completed,
+                    COUNT(*) AS total_sessions,
+                    SUM(s.total_seconds_watched) AS total_seconds_watched,
+                    COUNT(DISTINCT s.session_end_epoch / 86400) AS active_days,
+                    MAX({episode_order}) AS furthest_episode,
+                    MIN(s.session_start_epoch) AS first_watched_epoch,
+                    MAX(s.session_end_epoch) AS last_watched_epoch
+                FROM watch_hist_agg_sessions_data s
+                JOIN watch_hist_items i ON i.item_key = s.item_key
+                JOIN library_items l ON l.item_id = i.item_id
+                WHERE l.series_id IS NOT NULL AND {where_clause}
+                GROUP BY s.user_key, l.series_id
+            ),
+            series AS (
+                SELECT 
+                    l.series_id, 
+                    MAX(l.series_name) AS series_name, 
+                    COUNT(*) AS episodes_available, 
+                    MAX({episode_order}) AS last_episode
+                FROM library_items l
+                WHERE l.item_type = 'Episode' AND l.series_id IN (SELECT series_id FROM per_series)
+                GROUP BY l.series_id
+            )
+            SELECT 
+                p.user_key, p.series_id, se.series_name, p.episodes_watched, p.episodes_completed, se.episodes_available,
+                p.total_sessions, p.total_seconds_watched, p.active_days,
+                p.furthest_episode / 100000, p.furthest_episode % 100000,
+                COALESCE(p.furthest_episode >= se.last_episode, 0),
+                p.first_watched_epoch, p.last_watched_epoch,
+                CAST(strftime('%s', 'now') AS INTEGER)
+            FROM per_series p
+            LEFT JOIN series se ON se.series_id = p.series_id
+        """
+# -------------------------------------------
+
+
+    def _INIT_POPULATE_user_series_stats(self) -> bool:
+        """
+        **WARNING: THIS WILL FIRST DELETE ALL DATA IN THE `watch_hist_user_series_stats` TABLE**
+        
+        Builds the per-user series rollup from the aggregated sessions, in one pass. Run after the sessions are built.
+        """
+        if self._connection is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database connection not found!", file=sys.stderr)
+            return False
+        if self._cursor is None:
+            if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found!", file=sys.stderr)
+            return False
+        
+        if not self._INIT_create_user_watch_hist_schemas() or not self._INIT_create_user_series_stats_schema():
+            return False
+        
+        try:
+            self._cursor.execute("BEGIN")
+            refreshed_epoch = self._cursor.execute("SELECT CAST(strftime('%s', 'now') AS INTEGER)").fetchone()[0]
+            self._cursor.execute("DELETE FROM watch_hist_user_series_stats")
+            self._cursor.execute(self._build_user_series_stats_insert_sql())
             rows_inserted = self._cursor.rowcount
-            self._connection.commit()
             
-            if self._debug:
-                print(f"[SQLiteConnector] Successfully created stats for {rows_inserted} user-item pairs")
+            # sessions created (or library episodes changed) from here on are picked up by refresh_user_series_stats()
+            self._set_pipeline_state("series_stats_last_refresh_epoch", refreshed_epoch)
+            self._bump_data_version()
+            self._commit()
             
-        except sqlite3.Error as e:
             if self._debug:
-                print(f"[SQLiteConnector] ERROR creating user-item stats: {e}", file=sys.stderr)
+                print(f"[SQLiteConnector] Built series stats for {rows_inserted} user-series pairs")
+        
+        except sqlite3.Error as e:
+            if self._debug: print(f"[SQLiteConnector] ERROR building user series stats: {e}", file=sys.stderr)
             self._connection.rollback()
             return False
         
         return True
 # -------------------------------------------
 
-    def update_completion_ratios(self):
+
+    def refresh_user_series_stats(self) -> bool:
         """
-        Update completion ratios in sessions table using actual runtime data
+        Incrementally rebuilds the `watch_hist_user_series_stats` rows of (user, series) pairs that changed since the 
+        last build: pairs with sessions created since then, and every viewer of a series with an episode re-ingested 
+        since then (episodes available may have changed). Other rows are left as is.
+        
+        Falls back to the full `_INIT_POPULATE_user_series_stats` if the table has never been built, or if library items 
+        were pruned since (the pruned episodes can no longer be mapped to their series).
         """
         if self._connection is None:
             if self._debug: print(f"[SQliteConnector] ERROR: Database connection not found!", file=sys.stderr)
@@ -687,31 +2389,70 @@ class SQLiteConnector:
             if self._debug: print(f"[SQliteConnector] ERROR: Database cursor not found!", file=sys.stderr)
             return False
         
-        # SQLite-compatible correlated subquery (no UPDATE ... FROM support)
-        self._cursor.execute(
-            """
-            UPDATE watch_hist_agg_sessions
-            SET completion_ratio = MIN(
-                1.0,
-                CAST(total_seconds_watched AS REAL) / (
-                    SELECT runtime_seconds 
-                    FROM library_items l
-                    WHERE l.item_id = watch_hist_agg_sessions.item_id
+        if not self._INIT_create_user_watch_hist_schemas() or not self._INIT_create_user_series_stats_schema():
+            return False
+        
+        last_refresh = self._get_pipeline_state("series_stats_last_refresh_epoch")
+        last_prune = self._get_pipeline_state("library_last_prune_epoch")
+        if last_refresh is None or (last_prune is not None and int(last_prune) >= int(last_refresh)):
+            if self._debug: print("[SQLiteConnector] Series stats never built or library pruned since, running full build")
+            return self._INIT_POPULATE_user_series_stats()
+        last_refresh = int(last_refresh)
+        
+        try:
+            self._cursor.execute("BEGIN")
+            refreshed_epoch = self._cursor.execute("SELECT CAST(strftime('%s', 'now') AS INTEGER)").fetchone()[0]
+            
+            self._cursor.execute("DROP TABLE IF EXISTS temp.touched_series_pairs")
+            self._cursor.execute("CREATE TEMP TABLE touched_series_pairs (user_key INTEGER, series_id TEXT, PRIMARY KEY (user_key, series_id)) WITHOUT ROWID")
+            # sessions (re)created since the last build
+            self._cursor.execute("""
+                INSERT OR IGNORE INTO touched_series_pairs
+                SELECT s.user_key, l.series_id
+                FROM watch_hist_agg_sessions_data s
+                JOIN watch_hist_items i ON i.item_key = s.item_key
+                JOIN library_items l ON l.item_id = i.item_id
+                WHERE s.created_epoch >= ? AND l.series_id IS NOT NULL
+            """, (last_refresh,))
+            # every viewer of a series with episodes re-ingested since (library_items.last_updated is UTC text)
+            self._cursor.execute("""
+                INSERT OR IGNORE INTO touched_series_pairs
+                SELECT s.user_key, l.series_id
+                FROM library_items l
+                JOIN watch_hist_items i ON i.item_id = l.item_id
+                JOIN watch_hist_agg_sessions_data s ON s.item_key = i.item_key
+                WHERE l.series_id IN (
+                    SELECT series_id FROM library_items 
+                    WHERE last_updated >= datetime(?, 'unixepoch') AND series_id IS NOT NULL
                 )
-            )
-            WHERE EXISTS (
-                SELECT 1 FROM library_items l
-                WHERE l.item_id = watch_hist_agg_sessions.item_id
-                AND l.runtime_seconds > 0
-            )
-            """
-        )
+            """, (last_refresh,))
+            
+            pairs_touched = self._cursor.execute("SELECT COUNT(*) FROM touched_series_pairs").fetchone()[0]
+            if pairs_touched:
+                self._cursor.execute("""
+                    DELETE FROM watch_hist_user_series_stats
+                    WHERE (user_key, series_id) IN (SELECT user_key, series_id FROM touched_series_pairs)
+                """)
+                self._cursor.execute(self._build_user_series_stats_insert_sql(
+                    "EXISTS (SELECT 1 FROM touched_series_pairs t WHERE t.user_key = s.user_key AND t.series_id = l.series_id)"
+                ))
+                self._bump_data_version()
+            
+            self._set_pipeline_state("series_stats_last_refresh_epoch", refreshed_epoch)
+            self._commit()
+            self._cursor.execute("DROP TABLE IF EXISTS temp.touched_series_pairs")
+            
+            if self._debug:
+                print(f"[SQLiteConnector] Refreshed series stats for {pairs_touched} user-series pairs")
         
-        self._connection.commit()
+        except sqlite3.Error as e:
+            if self._debug: print(f"[SQLiteConnector] ERROR refreshing user series stats: {e}", file=sys.stderr)
+            self._connection.rollback()
+            return False
         
-        if self._debug:
-            print("[SQLiteConnector] Updated completion ratios with actual runtime data")
+        return True
 # -------------------------------------------
+
     
 
     # ====================================================================== Emby Library Tables ======================================================================
@@ -762,6 +2503,9 @@ class SQLiteConnector:
                 -- Timestamps
                 last_updated TEXT DEFAULT CURRENT_TIMESTAMP,
                 
+                -- digest of the item's stored fields + genre/tag/provider rows, unchanged items are skipped on ingest
+                content_hash TEXT,
+                
                 UNIQUE(item_id)
             )
         """
@@ -806,6 +2550,11 @@ class SQLiteConnector:
             self._cursor.execute(SCHEMA_item_genres)
             self._cursor.execute(SCHEMA_item_tags)
             
+            # databases created before content_hash existed: NULL hash = treated as changed on the next ingest
+            library_columns = {row[1] for row in self._cursor.execute("PRAGMA table_info(library_items)").fetchall()}
+            if "content_hash" not in library_columns:
+                self._cursor.execute("ALTER TABLE library_items ADD COLUMN content_hash TEXT")
+            
             # indexes
             self._cursor.execute("CREATE INDEX IF NOT EXISTS idx_library_series ON library_items(series_id)")
             self._cursor.execute("CREATE INDEX IF NOT EXISTS idx_library_type ON library_items(item_type)")
@@ -844,11 +2593,33 @@ class SQLiteConnector:
 # -------------------------------------------
 
 
-    def ingest_all_library_items(self, emby_items_iterable, get_item_metadata: Optional[Callable[[str], dict]] = None) -> bool:
+    def ingest_all_library_items(
+        self,
+        emby_items_iterable,
+        get_item_metadata: Optional[Callable[[str], dict]] = None,
+        get_items_metadata: Optional[Callable[[Sequence[str]], Dict[str, dict]]] = None,
+        batch_size: int = 1000,
+        prune: bool = True,
+    ) -> bool:
         """
         Ingest EVERY Movie/Episode from Emby into library_items (+ genres/tags + provider ids).
         emby_items_iterable should yield BaseItemDto dicts (see EmbyConnector.iter_all_items()).
-        Optionally provide get_item_metadata(item_id: str) to enable series-level genre fallback for Episodes.
+        
+        Each item's rows are digested into `library_items.content_hash`; items whose digest matches the stored one are 
+        skipped entirely, and changed items have their genre/tag/provider rows deleted and rewritten. Rows are buffered 
+        per table and written with one executemany per table every `batch_size` items (one commit per batch). 
+        Inserted/updated/unchanged/pruned counts and throughput are kept in `last_ingest_stats` after each call.
+        
+        NOTE: the Series genre fallback is only resolved for new or changed Episodes. Episodes whose Series lookup raised 
+        are stored with a NULL content_hash, so the next ingest retries them.
+        
+        `prune=False` skips deleting items that weren't yielded, for partial (delta) iterables - see sync_library_items().
+        
+        Episodes without genres fall back to their Series' genres. SeriesIds needing the fallback are collected during 
+        the pass and resolved together afterwards:
+        - get_items_metadata(ids) (preferred, see EmbyConnector.get_items_metadata()) resolves them in batched calls
+        - get_item_metadata(item_id) resolves them one series at a time
+        If neither is provided the fallback is skipped.
         """
         if self._connection is None or self._cursor is None:
             print("[SQLiteConnector] ERROR: DB not connected", file=sys.stderr)
@@ -865,8 +2636,8 @@ class SQLiteConnector:
             item_id, item_name, item_type,
             series_name, series_id, season_number, episode_number,
             runtime_ticks, premiere_date, overview, community_rating, production_year,
-            file_path, container, video_codec, resolution_width, resolution_height
-        ) VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+            file_path, container, video_codec, resolution_width, resolution_height, content_hash
+        ) VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
         """
 
         upsert_genre_sql = """
@@ -904,8 +2675,43 @@ class SQLiteConnector:
             # Deterministic non-negative id from name
             return int(zlib.crc32(name.lower().encode("utf-8")) & 0x7FFFFFFF)
 
-        # Cache for series metadata lookups to avoid repeated API calls
-        series_meta_cache: Dict[str, dict] = {}
+        # Episodes waiting on the series-level genre fallback: (item_id, series_id)
+        pending_series_genres: list[tuple[str, str]] = []
+        
+        # stored digests, to skip items that haven't changed since the last ingest
+        existing_hashes: Dict[str, Optional[str]] = {
+            str(item_id): content_hash for item_id, content_hash in cur.execute("SELECT item_id, content_hash FROM library_items")
+        }
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        
+        # per-table row buffers, flushed together so a batch's stale child rows are deleted, then items written before their child rows
+        changed_ids: list[tuple] = []
+        item_rows: list[tuple] = []
+        genre_rows: list[tuple] = []
+        tag_rows: list[tuple] = []
+        provider_rows: list[tuple] = []
+        write_seconds = 0.0
+        
+        def _flush():
+            nonlocal write_seconds
+            t0 = time.perf_counter()
+            if changed_ids:
+                cur.executemany("DELETE FROM item_genres WHERE item_id = ?", changed_ids)
+                cur.executemany("DELETE FROM item_tags WHERE item_id = ?", changed_ids)
+                cur.executemany("DELETE FROM item_provider_ids WHERE item_id = ?", changed_ids)
+                changed_ids.clear()
+            for sql, rows in (
+                (upsert_item_sql, item_rows),
+                (upsert_genre_sql, genre_rows),
+                (upsert_tag_sql, tag_rows),
+                (upsert_provider_sql, provider_rows),
+            ):
+                if rows:
+                    cur.executemany(sql, rows)
+                    rows.clear()
+            write_seconds += time.perf_counter() - t0
+        
+        started = time.perf_counter()
         try:
             self._connection.execute("BEGIN")
             batch = 0
@@ -924,27 +2730,27 @@ class SQLiteConnector:
                             height = height or s.get("Height")
                             break
 
-                cur.execute(
-                    upsert_item_sql,
-                    (
-                        item_id,
-                        item.get("Name"),
-                        item.get("Type"),
-                        item.get("SeriesName"),
-                        item.get("SeriesId"),
-                        item.get("ParentIndexNumber"),   # season number
-                        item.get("IndexNumber"),         # episode number
-                        item.get("RunTimeTicks"),
-                        item.get("PremiereDate"),
-                        item.get("Overview"),
-                        item.get("CommunityRating"),
-                        item.get("ProductionYear"),
-                        item.get("Path"),
-                        item.get("Container"),
-                        self._extract_video_codec(item),
-                        width, height
-                    )
+                item_row = (
+                    item_id,
+                    item.get("Name"),
+                    item.get("Type"),
+                    item.get("SeriesName"),
+                    item.get("SeriesId"),
+                    item.get("ParentIndexNumber"),   # season number
+                    item.get("IndexNumber"),         # episode number
+                    item.get("RunTimeTicks"),
+                    item.get("PremiereDate"),
+                    item.get("Overview"),
+                    item.get("CommunityRating"),
+                    item.get("ProductionYear"),
+                    item.get("Path"),
+                    item.get("Container"),
+                    self._extract_video_codec(item),
+                    width, height
                 )
+                item_genres: list[tuple] = []
+                item_tags: list[tuple] = []
+                item_providers: list[tuple] = []
 
                 # genres (prefer object form; fallback to name list and TMDB mapping)
                 added_genre_names = set()
@@ -953,7 +2759,7 @@ class SQLiteConnector:
                     gid = g.get("Id")
                     if gname:
                         added_genre_names.add(gname)
-                    cur.execute(upsert_genre_sql, (item_id, gid, gname))
+                    item_genres.append((item_id, gid, gname))
 
                 # Fallback to simple string list if present and not already added
                 for gname in item.get("Genres", []) or []:
@@ -971,39 +2777,9 @@ class SQLiteConnector:
                         gid = movie_genre_map.get(key) or tv_genre_map.get(key)
                     if gid is None:
                         gid = _stable_id_from_name(gname)
-                    cur.execute(upsert_genre_sql, (item_id, gid, gname))
+                    item_genres.append((item_id, gid, gname))
                     added_genre_names.add(gname)
 
-                # If still no genres on an Episode, fall back to its Series metadata
-                if not added_genre_names and (item.get("Type") == "Episode") and get_item_metadata:
-                    series_id = item.get("SeriesId")
-                    if series_id:
-                        sid = str(series_id)
-                        series_meta = series_meta_cache.get(sid)
-                        if series_meta is None:
-                            try:
-                                series_meta = get_item_metadata(sid) or {}
-                            except Exception as _e:
-                                series_meta = {}
-                            series_meta_cache[sid] = series_meta
-
-                        # Use Series GenreItems if available
-                        for g in series_meta.get("GenreItems", []) or []:
-                            gname = g.get("Name")
-                            gid = g.get("Id")
-                            if gname and gname not in added_genre_names:
-                                cur.execute(upsert_genre_sql, (item_id, gid, gname))
-                                added_genre_names.add(gname)
-
-                        # Fallback to Series Genres (names)
-                        for gname in series_meta.get("Genres", []) or []:
-                            if not gname or gname in added_genre_names:
-                                continue
-                            key = gname.lower()
-                            gid = tv_genre_map.get(key) or movie_genre_map.get(key) or _stable_id_from_name(gname)
-                            cur.execute(upsert_genre_sql, (item_id, gid, gname))
-                            added_genre_names.add(gname)
-
                 # tags
                 added_tag_names = set()
                 for t in item.get("TagItems", []) or []:
@@ -1011,29 +2787,120 @@ class SQLiteConnector:
                     tid = t.get("Id")
                     if tname:
                         added_tag_names.add(tname)
-                    cur.execute(upsert_tag_sql, (item_id, tid, tname))
+                    item_tags.append((item_id, tid, tname))
                 for tname in item.get("Tags", []) or []:
                     if not tname or tname in added_tag_names:
                         continue
                     tid = _stable_id_from_name(tname)
-                    cur.execute(upsert_tag_sql, (item_id, tid, tname))
+                    item_tags.append((item_id, tid, tname))
                     added_tag_names.add(tname)
 
                 # ProviderIds (TMDB/IMDB/TVDB etc.)
                 for provider, pid in (item.get("ProviderIds") or {}).items():
                     if pid:
-                        cur.execute(upsert_provider_sql, (item_id, provider, str(pid)))
+                        item_providers.append((item_id, provider, str(pid)))
+
+                # skip the rewrite entirely when nothing stored for this item has changed
+                content_hash = hashlib.blake2b(
+                    repr((item_row, item_genres, item_tags, item_providers)).encode("utf-8"), digest_size=16
+                ).hexdigest()
+                if item_id in existing_hashes and existing_hashes[item_id] == content_hash:
+                    counts["unchanged"] += 1
+                else:
+                    if item_id in existing_hashes:
+                        counts["updated"] += 1
+                        changed_ids.append((item_id,))
+                    else:
+                        counts["inserted"] += 1
+                    existing_hashes[item_id] = content_hash
+                    item_rows.append(item_row + (content_hash,))
+                    genre_rows.extend(item_genres)
+                    tag_rows.extend(item_tags)
+                    provider_rows.extend(item_providers)
+                    
+                    # If still no genres on an Episode, defer to its Series metadata (resolved in bulk after the pass)
+                    if not added_genre_names and (item.get("Type") == "Episode") and item.get("SeriesId"):
+                        pending_series_genres.append((item_id, str(item["SeriesId"])))
 
                 batch += 1
-                if batch % 1000 == 0:
+                if batch % batch_size == 0:
+                    _flush()
                     self._connection.commit()
                     self._connection.execute("BEGIN")
+                    if self._debug: print(f"[SQLiteConnector] Ingested {batch} items ({batch / (time.perf_counter() - started):.0f} items/s)")
+            _flush()
 
-            self._connection.commit()
+            # Resolve every distinct SeriesId at once, then apply the Series genres to the waiting Episodes
+            series_meta_cache: Dict[str, dict] = {}
+            failed_series: set[str] = set()
+            if pending_series_genres and (get_items_metadata or get_item_metadata):
+                series_ids = list(dict.fromkeys(sid for _, sid in pending_series_genres))
+                if get_items_metadata:
+                    try:
+                        series_meta_cache = get_items_metadata(series_ids) or {}
+                    except Exception as e:
+                        failed_series.update(series_ids)
+                        print(f"[SQLiteConnector] WARN: Batched series metadata lookup failed: {e}", file=sys.stderr)
+                else:
+                    for sid in series_ids:
+                        try:
+                            series_meta_cache[sid] = get_item_metadata(sid) or {}
+                        except Exception as e:
+                            failed_series.add(sid)
+                            print(f"[SQLiteConnector] WARN: Series metadata lookup failed for {sid}: {e}", file=sys.stderr)
+                
+                if self._debug: print(f"[SQLiteConnector] Series genre fallback: {len(pending_series_genres)} episodes across {len(series_ids)} series")
+
+                for item_id, sid in pending_series_genres:
+                    series_meta = series_meta_cache.get(sid) or {}
+                    added_genre_names = set()
+
+                    # Use Series GenreItems if available
+                    for g in series_meta.get("GenreItems", []) or []:
+                        gname = g.get("Name")
+                        gid = g.get("Id")
+                        if gname and gname not in added_genre_names:
+                            genre_rows.append((item_id, gid, gname))
+                            added_genre_names.add(gname)
+
+                    # Fallback to Series Genres (names)
+                    for gname in series_meta.get("Genres", []) or []:
+                        if not gname or gname in added_genre_names:
+                            continue
+                        key = gname.lower()
+                        gid = tv_genre_map.get(key) or movie_genre_map.get(key) or _stable_id_from_name(gname)
+                        genre_rows.append((item_id, gid, gname))
+                        added_genre_names.add(gname)
+                _flush()
+            
+            # the content hash doesn't cover the Series genres: episodes whose Series lookup raised get a NULL hash, so 
+            # the next ingest treats them as changed and retries the fallback. A Series Emby didn't return (or no lookup 
+            # function at all) is settled as "no genres" - retrying those would rewrite the same episodes every run
+            unresolved_ids = [(item_id,) for item_id, sid in pending_series_genres if sid in failed_series]
+            if unresolved_ids:
+                cur.executemany("UPDATE library_items SET content_hash = NULL WHERE item_id = ?", unresolved_ids)
+                if self._debug: print(f"[SQLiteConnector] Series genres unresolved for {len(unresolved_ids)} episodes, retried on the next ingest")
+
+            if counts["inserted"] or counts["updated"]:
+                self._bump_data_version()
+            self._commit()
             
             # prune after ingest
-            deleted = self.prune_missing_items(seen)
-            if self._debug: print(f"Pruned {deleted} items no longer in Emby.")
+            deleted = self.prune_missing_items(seen) if prune else 0
+            if self._debug and prune: print(f"Pruned {deleted} items no longer in Emby.")
+            
+            elapsed = time.perf_counter() - started
+            self.last_ingest_stats = {
+                "items": batch,
+                **counts,
+                "pruned": deleted,
+                "elapsed_seconds": elapsed,
+                "write_seconds": write_seconds,
+                "items_per_second": batch / elapsed if elapsed > 0 else 0.0,
+            }
+            if self._debug: 
+                print(f"[SQLiteConnector] Ingested {batch} items in {elapsed:.2f}s ({self.last_ingest_stats['items_per_second']:.0f} items/s, {write_seconds:.2f}s writing)")
+                print(f"  inserted: {counts['inserted']}, updated: {counts['updated']}, unchanged: {counts['unchanged']}, pruned: {deleted}")
             
             return True
 
@@ -1044,6 +2911,107 @@ class SQLiteConnector:
 # -------------------------------------------
 
 
+    def sync_library_items(
+        self,
+        emby_items_func: Callable[..., Iterable[dict]],
+        emby_item_ids_func: Callable[[], Iterable[str]],
+        get_items_metadata: Optional[Callable[[Sequence[str]], Dict[str, dict]]] = None,
+        full_scan_interval_hours: float = 24,
+        overlap_minutes: int = 10,
+        batch_size: int = 1000,
+    ) -> bool:
+        """
+        Delta sync of the library tables: only items added or modified in Emby since the last successful sync are 
+        fetched and ingested. Deletions can't be seen in a delta, so every `full_scan_interval_hours` a cheap id-only 
+        scan of the whole library feeds prune_missing_items(). Falls back to a full ingest_all_library_items() when 
+        the library has never been synced.
+        
+        Sync times are stored in `pipeline_state` (`library_last_sync_timestamp`, `library_last_id_scan_timestamp`).
+        
+        Args:
+            emby_items_func (Callable): EmbyConnector.iter_all_items, called with `min_date_last_saved=` for deltas
+            emby_item_ids_func (Callable): EmbyConnector.iter_all_item_ids, yields every item id in the library
+            get_items_metadata (Callable, optional): Batched metadata lookup for the Series genre fallback, also used to 
+                re-fetch items stored with a NULL content hash (failed Series genre lookups)
+            full_scan_interval_hours (float, optional): Minimum hours between id-only deletion scans - DEFAULT: 24
+            overlap_minutes (int, optional): Re-fetch window before the last sync, covers clock skew and items saved 
+                while the previous sync was running (unchanged ones are skipped by content hash) - DEFAULT: 10
+        """
+        if self._connection is None or self._cursor is None:
+            print("[SQLiteConnector] ERROR: DB not connected", file=sys.stderr)
+            return False
+        
+        # Emby's DateLastSaved is UTC
+        sync_started = datetime.now(timezone.utc)
+        last_sync = self._get_pipeline_state("library_last_sync_timestamp")
+        last_id_scan = self._get_pipeline_state("library_last_id_scan_timestamp")
+        
+        if last_sync is None:
+            if self._debug: print("[SQLiteConnector] No library sync recorded, running full library ingest")
+            ok = self.ingest_all_library_items(emby_items_func(), get_items_metadata=get_items_metadata, batch_size=batch_size)
+            last_id_scan = None if not ok else sync_started.isoformat()
+        else:
+            since = datetime.fromisoformat(last_sync) - timedelta(minutes=overlap_minutes)
+            min_date_last_saved = since.strftime("%Y-%m-%dT%H:%M:%S.0000000Z")
+            if self._debug: print(f"[SQLiteConnector] Delta library sync: items saved since {min_date_last_saved}")
+            # items stored with a NULL content hash (e.g. their Series genre lookup failed) aren't re-saved in Emby, so 
+            # the delta never includes them: re-fetch them by id after it
+            retry_ids = [item_id for (item_id,) in self._cursor.execute("SELECT item_id FROM library_items WHERE content_hash IS NULL")]
+            
+            def _delta_items() -> Iterator[dict]:
+                yielded = set()
+                for item in emby_items_func(min_date_last_saved=min_date_last_saved):
+                    yielded.add(str(item.get("Id")))
+                    yield item
+                if not (retry_ids and get_items_metadata):
+                    return
+                try:
+                    retried = get_items_metadata(retry_ids)
+                except Exception as e:
+                    print(f"[SQLiteConnector] WARN: Re-fetching {len(retry_ids)} unresolved items failed: {e}", file=sys.stderr)
+                    return
+                if self._debug: print(f"[SQLiteConnector] Re-fetched {len(retried)}/{len(retry_ids)} items with a NULL content hash")
+                for item_id, item in retried.items():
+                    if str(item_id) not in yielded:
+                        yield item
+            
+            ok = self.ingest_all_library_items(
+                _delta_items(),
+                get_items_metadata=get_items_metadata,
+                batch_size=batch_size,
+                prune=False,
+            )
+            
+            # periodic id-only scan to catch deletions
+            scan_due = last_id_scan is None or sync_started - datetime.fromisoformat(last_id_scan) >= timedelta(hours=full_scan_interval_hours)
+            if ok and scan_due:
+                try:
+                    current_ids = set(emby_item_ids_func())
+                except Exception as e:
+                    print(f"[SQLiteConnector] WARN: Library id scan failed, pruning skipped: {e}", file=sys.stderr)
+                else:
+                    deleted = self.prune_missing_items(current_ids)
+                    ok = deleted >= 0
+                    self.last_ingest_stats["pruned"] = deleted
+                    last_id_scan = sync_started.isoformat()
+                    if self._debug: print(f"[SQLiteConnector] Id scan: {len(current_ids)} items in Emby, pruned {deleted}")
+        
+        if not ok:
+            return False
+        
+        try:
+            self._set_pipeline_state("library_last_sync_timestamp", sync_started.isoformat())
+            self._set_pipeline_state("library_last_id_scan_timestamp", last_id_scan)
+            self._connection.commit()
+        except sqlite3.Error as e:
+            print(f"[SQLiteConnector] ERROR: Failed to record library sync time: {e}", file=sys.stderr)
+            self._connection.rollback()
+            return False
+        
+        return True
+# -------------------------------------------
+
+
     
     # ====================================================================== TMDB Tables ======================================================================
     
@@ -1100,8 +3068,9 @@ class SQLiteConnector:
                 self._cursor.execute("INSERT OR REPLACE INTO tmdb_movie_genres(id, name) VALUES(?,?)", (genre["id"], genre["name"]))
             for genre in fetch_tv_genre_func():
                 self._cursor.execute("INSERT OR REPLACE INTO tmdb_tv_genres(id, name) VALUES(?,?)", (genre["id"], genre["name"]))
+            self._bump_data_version()
             
-            self._connection.commit()
+            self._commit()
             
             if self._debug: print("Successfully ingested genres into TMDB tables!")
             
@@ -1114,6 +3083,465 @@ class SQLiteConnector:
     # ====================================================================== Table fetch methods ======================================================================
 
     def get_watch_hist_user_items_stats(self) -> pd.DataFrame:
-        """Returns the watch_hist_user_item_stats table as a pandas DataFrame"""
+        """
+        Returns the watch_hist_user_item_stats table as a pandas DataFrame (read through the read-only pool, safe to call from many threads)
+        
+        NOTE: kept for existing callers, prefer `read_user_item_stats` / `iter_user_item_stats` to pull only the slice needed
+        """
+        return self.read_user_item_stats()
+# -----------------------
+
+
+    def read_user_item_stats(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        user_ids: str | Sequence[str] | None = None,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+        item_type: str | Sequence[str] | None = None,
+        output: str = "pandas",
+    ) -> T_ReadResult:
+        """
+        Reads per user/item watch statistics with explicit dtypes (timestamps as datetime64[s]).
+        
+        Args:
+            columns (Sequence[str], optional): Columns to return, see READ_DATASETS["user_item_stats"] - DEFAULT: all
+            user_ids (str | Sequence[str], optional): Only these Emby user ids
+            start (datetime | str, optional): Only items last watched at or after this (local) time
+            end (datetime | str, optional): Only items last watched before this (local) time
+            item_type (str | Sequence[str], optional): e.g. "Movie", "Episode"
+            output (str, optional): "pandas" (DataFrame), "numpy" (dict of column -> ndarray) or "arrow" (pyarrow.Table) - DEFAULT: "pandas"
+        """
+        return self._read_dataset("user_item_stats", columns, user_ids, start, end, item_type, None, output)
+# -----------------------
+
+
+    def iter_user_item_stats(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        user_ids: str | Sequence[str] | None = None,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+        item_type: str | Sequence[str] | None = None,
+        output: str = "pandas",
+        chunk_size: int = 50_000,
+    ) -> Iterator[T_ReadResult]:
+        """
+        Chunked `read_user_item_stats`: yields at most `chunk_size` rows at a time, so only one chunk is held in memory.
+        """
+        return self._iter_dataset("user_item_stats", columns, user_ids, start, end, item_type, None, output, chunk_size)
+# -----------------------
+
+
+    def read_sessions(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        user_ids: str | Sequence[str] | None = None,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+        item_type: str | Sequence[str] | None = None,
+        item_ids: str | Sequence[str] | None = None,
+        output: str = "pandas",
+    ) -> T_ReadResult:
+        """
+        Reads aggregated watch sessions with explicit dtypes (timestamps as datetime64[s]).
         
-        return pd.read_sql_query(self._cursor.execute("SELECT * FROM watch_user_item_stats"), self._connection)
+        Args:
+            columns (Sequence[str], optional): Columns to return, see READ_DATASETS["sessions"] - DEFAULT: all
+            user_ids (str | Sequence[str], optional): Only these Emby user ids
+            start (datetime | str, optional): Only sessions ending at or after this (local) time
+            end (datetime | str, optional): Only sessions ending before this (local) time
+            item_type (str | Sequence[str], optional): e.g. "Movie", "Episode"
+            item_ids (str | Sequence[str], optional): Only these Emby item ids
+            output (str, optional): "pandas", "numpy" or "arrow" - DEFAULT: "pandas"
+        """
+        return self._read_dataset("sessions", columns, user_ids, start, end, item_type, item_ids, output)
+# -----------------------
+
+
+    def iter_sessions(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        user_ids: str | Sequence[str] | None = None,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+        item_type: str | Sequence[str] | None = None,
+        item_ids: str | Sequence[str] | None = None,
+        output: str = "pandas",
+        chunk_size: int = 50_000,
+    ) -> Iterator[T_ReadResult]:
+        """
+        Chunked `read_sessions`: yields at most `chunk_size` rows at a time, so only one chunk is held in memory.
+        """
+        return self._iter_dataset("sessions", columns, user_ids, start, end, item_type, item_ids, output, chunk_size)
+# -----------------------
+
+
+    def read_library_items(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        item_type: str | Sequence[str] | None = None,
+        item_ids: str | Sequence[str] | None = None,
+        output: str = "pandas",
+    ) -> T_ReadResult:
+        """
+        Reads library items with explicit dtypes, including their genres, genre ids and tags as lists.
+        
+        NOTE: the genre/tag lists are aggregated per row, leave them out of `columns` when they aren't needed
+        
+        Args:
+            columns (Sequence[str], optional): Columns to return, see READ_DATASETS["library_items"] - DEFAULT: all
+            item_type (str | Sequence[str], optional): e.g. "Movie", "Episode"
+            item_ids (str | Sequence[str], optional): Only these Emby item ids
+            output (str, optional): "pandas", "numpy" or "arrow" - DEFAULT: "pandas"
+        """
+        return self._read_dataset("library_items", columns, None, None, None, item_type, item_ids, output)
+# -----------------------
+
+
+    def iter_library_items(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        item_type: str | Sequence[str] | None = None,
+        item_ids: str | Sequence[str] | None = None,
+        output: str = "pandas",
+        chunk_size: int = 50_000,
+    ) -> Iterator[T_ReadResult]:
+        """
+        Chunked `read_library_items`: yields at most `chunk_size` rows at a time, so only one chunk is held in memory.
+        """
+        return self._iter_dataset("library_items", columns, None, None, None, item_type, item_ids, output, chunk_size)
+# -----------------------
+
+
+    def read_user_series_stats(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        user_ids: str | Sequence[str] | None = None,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+        series_ids: str | Sequence[str] | None = None,
+        output: str = "pandas",
+    ) -> T_ReadResult:
+        """
+        Reads the per user/series episode rollup with explicit dtypes, see `_INIT_POPULATE_user_series_stats`.
+        
+        Args:
+            columns (Sequence[str], optional): Columns to return, see READ_DATASETS["user_series_stats"] - DEFAULT: all
+            user_ids (str | Sequence[str], optional): Only these Emby user ids
+            start (datetime | str, optional): Only series last watched at or after this (local) time
+            end (datetime | str, optional): Only series last watched before this (local) time
+            series_ids (str | Sequence[str], optional): Only these Emby series ids
+            output (str, optional): "pandas", "numpy" or "arrow" - DEFAULT: "pandas"
+        """
+        return self._read_dataset("user_series_stats", columns, user_ids, start, end, None, series_ids, output)
+# -----------------------
+
+
+    def iter_user_series_stats(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        user_ids: str | Sequence[str] | None = None,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+        series_ids: str | Sequence[str] | None = None,
+        output: str = "pandas",
+        chunk_size: int = 50_000,
+    ) -> Iterator[T_ReadResult]:
+        """
+        Chunked `read_user_series_stats`: yields at most `chunk_size` rows at a time, so only one chunk is held in memory.
+        """
+        return self._iter_dataset("user_series_stats", columns, user_ids, start, end, None, series_ids, output, chunk_size)
+# -----------------------
+
+
+    def read_user_genre_affinity(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        user_ids: str | Sequence[str] | None = None,
+        output: str = "pandas",
+    ) -> T_ReadResult:
+        """
+        Reads the precomputed genre affinity profile of users (one row per user and genre), see `_INIT_POPULATE_user_affinity`.
+        
+        Args:
+            columns (Sequence[str], optional): Columns to return, see READ_DATASETS["user_genre_affinity"] - DEFAULT: all
+            user_ids (str | Sequence[str], optional): Only these Emby user ids
+            output (str, optional): "pandas", "numpy" or "arrow" - DEFAULT: "pandas"
+        """
+        return self._read_dataset("user_genre_affinity", columns, user_ids, None, None, None, None, output)
+# -----------------------
+
+
+    def read_user_tag_affinity(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        user_ids: str | Sequence[str] | None = None,
+        output: str = "pandas",
+    ) -> T_ReadResult:
+        """
+        Reads the precomputed tag affinity profile of users (one row per user and tag), see `_INIT_POPULATE_user_affinity`.
+        
+        Args:
+            columns (Sequence[str], optional): Columns to return, see READ_DATASETS["user_tag_affinity"] - DEFAULT: all
+            user_ids (str | Sequence[str], optional): Only these Emby user ids
+            output (str, optional): "pandas", "numpy" or "arrow" - DEFAULT: "pandas"
+        """
+        return self._read_dataset("user_tag_affinity", columns, user_ids, None, None, None, None, output)
+# -----------------------
+
+
+    def _build_read_query(
+        self,
+        dataset: str,
+        columns: Optional[Sequence[str]],
+        user_ids: str | Sequence[str] | None,
+        start: datetime | str | None,
+        end: datetime | str | None,
+        item_type: str | Sequence[str] | None,
+        item_ids: str | Sequence[str] | None,
+    ) -> tuple[str, list, Dict[str, str]]:
+        """
+        Builds the projected, filtered SELECT for a READ_DATASETS entry.
+        
+        List filters are bound as a single JSON array (`IN (SELECT value FROM json_each(?))`), so any number of ids 
+        fits in one parameter.
+        
+        Returns:
+            tuple: (sql, params, {column: dtype}) in output column order
+        
+        Raises:
+            ValueError: Unknown dataset or column, or a filter the dataset doesn't support
+        """
+        spec = self.READ_DATASETS.get(dataset)
+        if spec is None:
+            raise ValueError(f"Unknown read dataset '{dataset}', expected one of: {', '.join(self.READ_DATASETS)}")
+        
+        columns = list(spec["columns"]) if columns is None else list(columns)
+        unknown = [column for column in columns if column not in spec["columns"]]
+        if unknown:
+            raise ValueError(f"Unknown {dataset} column(s): {', '.join(unknown)}")
+        
+        where: list[str] = []
+        params: list = []
+        for values, filter_column, name in (
+            (user_ids, spec["user_column"], "user_ids"),
+            (item_type, spec["item_type_column"], "item_type"),
+            (item_ids, spec["item_column"], "item_ids"),
+        ):
+            if values is None:
+                continue
+            if filter_column is None:
+                raise ValueError(f"{dataset} can't be filtered by {name}")
+            where.append(f"{filter_column} IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps([values] if isinstance(values, str) else list(values)))
+        
+        for bound, operator in ((start, ">="), (end, "<")):
+            if bound is None:
+                continue
+            if spec["time_column"] is None:
+                raise ValueError(f"{dataset} can't be filtered by date range")
+            where.append(f"{spec['time_column']} {operator} ?")
+            params.append(self._to_epoch(bound))
+        
+        select_list = ",\n                ".join(f"{spec['columns'][column][0]} AS {column}" for column in columns)
+        sql = f"""
+            SELECT 
+                {select_list}
+            FROM {spec['from']}
+            WHERE {' AND '.join(where) or 'true'}
+        """
+        return sql, params, {column: spec["columns"][column][1] for column in columns}
+# -----------------------
+
+
+    def _read_dataset(self, dataset: str, columns, user_ids, start, end, item_type, item_ids, output: str) -> T_ReadResult:
+        """
+        Runs a `_build_read_query` query in one go through the read-only pool and converts the result. Results are 
+        served from the read cache when the same query + parameters were read since the data last changed.
+        """
+        sql, params, dtypes = self._build_read_query(dataset, columns, user_ids, start, end, item_type, item_ids)
+        self._check_read_output(output)
+        
+        def _load() -> T_ReadResult:
+            with self.read_connection() as connection:
+                frame = pd.read_sql_query(sql, connection, params=params)
+            return self._convert_read_frame(frame, dtypes, output)
+        
+        if self._read_cache_size == 0:
+            return _load()
+        result = self._cached_read(("read", sql, tuple(params), output), _load)
+        # callers get their own copy, so mutating a result never changes the cached one (pyarrow Tables are immutable)
+        if output == "pandas":
+            return result.copy()
+        if output == "numpy":
+            return {column: values.copy() for column, values in result.items()}
+        return result
+# -----------------------
+
+
+    def get_user_watched_item_ids(self, user_id: str, item_type: str | Sequence[str] | None = None) -> frozenset:
+        """
+        Returns the ids of every item `user_id` has watched (has user/item stats for), e.g. to filter already seen 
+        items out of recommendations. Served from the read cache until the data changes.
+        
+        Args:
+            user_id (str): Emby user id
+            item_type (str | Sequence[str], optional): e.g. "Movie", "Episode"
+        
+        Returns:
+            frozenset[str]: Emby item ids, empty if the user has no watch history
+        """
+        sql, params, _ = self._build_read_query("user_item_stats", ["item_id"], user_id, None, None, item_type, None)
+        
+        def _load() -> frozenset:
+            with self.read_connection() as connection:
+                return frozenset(item_id for (item_id,) in connection.execute(sql, params))
+        
+        return self._cached_read(("watched_item_ids", sql, tuple(params)), _load)
+# -----------------------
+
+
+    def _cached_read(self, key: tuple, load: Callable[[], object]):
+        """
+        Returns the cached result for `key`, or runs `load()` and caches what it returns, evicting the least recently 
+        used entries beyond `read_cache_size`. The whole cache is dropped as soon as the `data_version` counter in 
+        `pipeline_state` has moved, i.e. after any ingest/refresh (from this process or another one).
+        
+        Args:
+            key (tuple): Identifies the read, e.g. ("read", sql, params, output)
+            load (Callable[[], object]): Runs the query, called on a cache miss (outside the cache lock)
+        """
+        if self._read_cache_size == 0:
+            return load()
+        
+        version = self._current_data_version()
+        with self._read_cache_lock:
+            generation = self._read_cache_generation
+            if version != self._read_cache_version:
+                self._read_cache.clear()
+                self._read_cache_version = version
+            elif key in self._read_cache:
+                self._read_cache.move_to_end(key)
+                self.read_cache_stats["hits"] += 1
+                return self._read_cache[key]
+            self.read_cache_stats["misses"] += 1
+        
+        result = load()
+        with self._read_cache_lock:
+            # skip caching if the data changed (or the cache was cleared) while loading
+            if self._read_cache_version == version and self._read_cache_generation == generation:
+                self._read_cache[key] = result
+                self._read_cache.move_to_end(key)
+                while len(self._read_cache) > self._read_cache_size:
+                    self._read_cache.popitem(last=False)
+        return result
+# -----------------------
+
+
+    def _current_data_version(self) -> int:
+        """
+        Returns the `data_version` counter from `pipeline_state` (0 before any ingest). Re-read through the read-only 
+        pool at most once every `cache_check_interval` seconds, so writes from other processes reach cached reads 
+        within that interval.
+        """
+        now = time.monotonic()
+        with self._read_cache_lock:
+            if self._data_version_checked_at is not None and now - self._data_version_checked_at < self._cache_check_interval:
+                return self._data_version
+            generation = self._read_cache_generation
+        
+        try:
+            with self.read_connection() as connection:
+                row = connection.execute("SELECT value FROM pipeline_state WHERE key = 'data_version'").fetchone()
+        except sqlite3.OperationalError:     # pipeline_state not created yet
+            row = None
+        
+        version = 0 if row is None else int(row[0])
+        with self._read_cache_lock:
+            # a version read before a clear_read_cache() may predate the commit that triggered it, don't keep it
+            if self._read_cache_generation == generation:
+                self._data_version = version
+                self._data_version_checked_at = now
+        return version
+# -----------------------
+
+
+    def clear_read_cache(self) -> None:
+        """Drops every cached read result, and makes the next cached read re-check the data version"""
+        with self._read_cache_lock:
+            self._read_cache.clear()
+            self._read_cache_version = None
+            self._data_version_checked_at = None
+            self._read_cache_generation += 1
+# -----------------------
+
+
+    def _iter_dataset(self, dataset: str, columns, user_ids, start, end, item_type, item_ids, output: str, chunk_size: int) -> Iterator[T_ReadResult]:
+        """
+        Streams a `_build_read_query` query in `chunk_size` row chunks. The query is validated here, but the pooled 
+        connection is only checked out once iteration starts (and returned when the iterator is exhausted or closed).
+        """
+        sql, params, dtypes = self._build_read_query(dataset, columns, user_ids, start, end, item_type, item_ids)
+        self._check_read_output(output)
+        
+        def _chunks() -> Iterator[T_ReadResult]:
+            with self.read_connection() as connection:
+                for frame in pd.read_sql_query(sql, connection, params=params, chunksize=chunk_size):
+                    yield self._convert_read_frame(frame, dtypes, output)
+        
+        return _chunks()
+# -----------------------
+
+
+    def _check_read_output(self, output: str) -> None:
+        """Raises ValueError for an unsupported read output format"""
+        if output not in ("pandas", "numpy", "arrow"):
+            raise ValueError(f"Unknown read output '{output}', expected 'pandas', 'numpy' or 'arrow'")
+# -----------------------
+
+
+    def _convert_read_frame(self, frame: pd.DataFrame, dtypes: Dict[str, str], output: str) -> T_ReadResult:
+        """
+        Casts a raw query frame to the declared dtypes, then converts it to the requested output.
+        
+        "numpy" output: nullable "Int64" columns become float64 (NaN for NULL), lists and strings are object arrays.
+        "arrow" output: built against an explicit schema, nullable ints stay int64 with nulls.
+        """
+        for column, dtype in dtypes.items():
+            values = frame[column]
+            if dtype == "datetime64[s]":
+                epochs = values.to_numpy(dtype=np.float64, na_value=np.nan)
+                frame[column] = np.where(np.isnan(epochs), np.iinfo(np.int64).min, epochs).astype(np.int64).view("datetime64[s]")
+            elif dtype.startswith("list["):
+                # not deduplicated, so parallel lists (genres / genre_ids) stay aligned; '' placeholders are NULLs
+                cast = int if dtype == "list[int]" else str
+                frame[column] = pd.Series(
+                    [[] if pd.isna(joined) else [None if v == "" else cast(v) for v in str(joined).split("\x1f")] for joined in values],
+                    index=frame.index, dtype="object",
+                )
+            elif dtype == "object":
+                frame[column] = values.astype("object").where(values.notna(), None)
+            else:
+                frame[column] = values.astype(dtype)
+        
+        if output == "pandas":
+            return frame
+        
+        if output == "numpy":
+            return {
+                column: (
+                    frame[column].to_numpy(dtype=np.float64, na_value=np.nan) if dtype == "Int64" 
+                    else frame[column].to_numpy(dtype=dtype if dtype in ("int64", "float64", "datetime64[s]") else object)
+                )
+                for column, dtype in dtypes.items()
+            }
+        
+        import pyarrow as pa     # only needed for arrow output
+        arrow_types = {
+            "object": pa.string(), "int64": pa.int64(), "Int64": pa.int64(), "float64": pa.float64(),
+            "datetime64[s]": pa.timestamp("s"), "list[str]": pa.list_(pa.string()), "list[int]": pa.list_(pa.int64()),
+        }
+        schema = pa.schema([(column, arrow_types[dtype]) for column, dtype in dtypes.items()])
+        return pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+# -----------------------
@@ -1,4 +1,4 @@
-from typing import TypedDict, List, Tuple
+from typing import Iterable, TypedDict, List, Tuple
 
 class T_EmbyUserWatchHistItem(TypedDict):
     """Single item in user's watch history from Emby API"""
@@ -18,6 +18,9 @@ T_EmbyUserWatchHistResponse = List[T_EmbyUserWatchHistItem]
 
 T_EmbyAllUserWatchHist = dict[str, T_EmbyUserWatchHistResponse]
 
+#: (username, watch history) pairs yielded per user as they are fetched
+T_EmbyUserWatchHistStream = Iterable[Tuple[str, T_EmbyUserWatchHistResponse]]
+
 
 T_EmbyWatchHistStatsRow = Tuple[
     int,    # stat_id
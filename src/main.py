@@ -38,14 +38,13 @@ SQLITE_DB_NAME: Final = os.getenv("SQLITE_DB_NAME") or "EMBRACE_SQLITE_DB.db"
 
 # # ingest library metadata first so runtime is available for later calculations
 # sqlite._INIT_create_library_items_schema()
-# ok = sqlite.ingest_all_library_items(Emby.iter_all_items(), Emby.get_item_metadata)
+# ok = sqlite.ingest_all_library_items(Emby.iter_all_items(), get_items_metadata=Emby.get_items_metadata)
 # print("Ingest complete:", ok)
 
 # # process watch history using actual runtimes
-# sqlite._INIT_POPULATE_watch_hist_raw_events(Emby.get_all_watch_hist)
+# sqlite._INIT_POPULATE_watch_hist_raw_events(Emby.iter_all_watch_hist)
 # sqlite._INIT_POPULATE_watch_hist_agg_sessions()
 # sqlite._INIT_POPULATE_watch_hist_user_item_stats()
-# sqlite.update_completion_ratios()
 
 #  # create and ingest TMDB tables
 # sqlite._INIT_create_tmdb_schemas()